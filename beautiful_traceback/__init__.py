@@ -1,9 +1,122 @@
-from ._extension import load_ipython_extension  # noqa: F401
-from .config import configure, get_config  # noqa: F401
-from .formatting import LoggingFormatter, LoggingFormatterMixin  # noqa: F401
-from .hook import install, uninstall  # noqa: F401
-from .json_formatting import exc_to_json  # noqa: F401
-from .version import __version__  # noqa: F401
-
-# retain typo for backward compatibility
-LoggingFormaterMixin = LoggingFormatterMixin
+"""Beautiful, readable Python tracebacks.
+
+Public attributes are resolved lazily (PEP 562), so `import beautiful_traceback`
+from the .pth injection costs next to nothing. The formatting machinery is
+imported on first use.
+"""
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from ._extension import load_ipython_extension, unload_ipython_extension
+    from .config import configure, get_config
+    from .deadline import get_formatting_stats
+    from .formatting import LoggingFormatter, LoggingFormatterMixin
+    from .hook import install, new_event_loop, uninstall, warmup
+    from .json_formatting import exc_to_json
+    from .loop_watchdog import install_loop_watchdog
+    from .stack_dump import install_stack_dump
+    from .task_dump import install_task_dump
+    from .task_origins import install_task_origins
+    from .version import __version__
+
+    # retain typo for backward compatibility
+    LoggingFormaterMixin = LoggingFormatterMixin
+
+# public attribute -> (submodule, attribute name)
+_LAZY_ATTRIBUTES: dict[str, tuple[str, str]] = {
+    "load_ipython_extension": ("_extension", "load_ipython_extension"),
+    "unload_ipython_extension": ("_extension", "unload_ipython_extension"),
+    "configure": ("config", "configure"),
+    "get_config": ("config", "get_config"),
+    "get_formatting_stats": ("deadline", "get_formatting_stats"),
+    "LoggingFormatter": ("formatting", "LoggingFormatter"),
+    "LoggingFormatterMixin": ("formatting", "LoggingFormatterMixin"),
+    # retain typo for backward compatibility
+    "LoggingFormaterMixin": ("formatting", "LoggingFormatterMixin"),
+    "install": ("hook", "install"),
+    "new_event_loop": ("hook", "new_event_loop"),
+    "uninstall": ("hook", "uninstall"),
+    "warmup": ("hook", "warmup"),
+    "exc_to_json": ("json_formatting", "exc_to_json"),
+    "install_loop_watchdog": ("loop_watchdog", "install_loop_watchdog"),
+    "install_stack_dump": ("stack_dump", "install_stack_dump"),
+    "install_task_dump": ("task_dump", "install_task_dump"),
+    "install_task_origins": ("task_origins", "install_task_origins"),
+    "__version__": ("version", "__version__"),
+}
+
+_SUBMODULES = frozenset(
+    {
+        "aliases",
+        "asgi",
+        "cli",
+        "common",
+        "config",
+        "deadline",
+        "emergency",
+        "formatting",
+        "frame_filter",
+        "hook",
+        "json_formatting",
+        "loop_watchdog",
+        "output",
+        "parsing",
+        "policy",
+        "pytest_assertion",
+        "pytest_dedupe",
+        "pytest_json",
+        "pytest_longrepr",
+        "pytest_plugin",
+        "pytest_watchdog",
+        "stack_dump",
+        "task_dump",
+        "task_origins",
+        "trampoline",
+        "version",
+    }
+)
+
+__all__ = [
+    "LoggingFormatter",
+    "LoggingFormatterMixin",
+    "__version__",
+    "configure",
+    "exc_to_json",
+    "get_config",
+    "get_formatting_stats",
+    "install",
+    "install_loop_watchdog",
+    "install_stack_dump",
+    "install_task_dump",
+    "install_task_origins",
+    "load_ipython_extension",
+    "new_event_loop",
+    "uninstall",
+    "unload_ipython_extension",
+    "warmup",
+]
+
+
+def _import_submodule(name: str) -> object:
+    # NOTE: __import__ instead of importlib.import_module, importing importlib
+    #   (and warnings with it) would double the cost of the .pth startup script
+    return __import__(f"{__name__}.{name}", fromlist=["__name__"])
+
+
+def __getattr__(name: str) -> object:
+    if name in _SUBMODULES:
+        return _import_submodule(name)
+
+    target = _LAZY_ATTRIBUTES.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attr = target
+    value = getattr(_import_submodule(module_name), attr)
+    # cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_ATTRIBUTES, *_SUBMODULES})
@@ -0,0 +1,78 @@
+"""Well-known aliases for sys.path entries (<site>, <dist>, <py>, <pwd>).
+
+Kept free of heavy imports (no `re`) so `install()` can precompute the
+emergency alias table without pulling in the formatting machinery.
+"""
+
+Alias = str
+Prefix = str
+
+AliasPrefix = tuple[Alias, Prefix]
+AliasPrefixes = list[AliasPrefix]
+
+
+def sorted_py_paths(paths: list[str]) -> list[str]:
+    # NOTE (mb 2020-08-16): We don't know which path entry
+    #   was used to import a module. I guess we could figure it
+    #   out, but the preference here is to make the shortest
+    #   path possible.
+
+    # NOTE (mb 2020-10-04): aliases must be sorted from longest to
+    #   shortest, so that the longer matches are used first.
+    return sorted((path for path in paths if path), key=len, reverse=True)
+
+
+def _is_version(text: str) -> bool:
+    # matches the regex `\d.\d+`
+    return len(text) >= 3 and text[0].isdigit() and text[2:].isdigit()
+
+
+def _is_stdlib_path(py_path: str) -> bool:
+    # lib/python3.12
+    _, sep, version = py_path.rpartition("lib/python")
+    if sep and _is_version(version):
+        return True
+
+    # lib/Python3.12\lib
+    _, sep, rest = py_path.rpartition("lib/Python")
+    return bool(sep) and rest.endswith("\\lib") and _is_version(rest[:-4])
+
+
+def named_alias(py_path: str, pwd: str) -> AliasPrefix | None:
+    """Return the well-known alias for a sys.path entry, if it has one."""
+    if py_path.endswith("site-packages"):
+        return ("<site>", py_path)
+    elif py_path.endswith("dist-packages"):
+        return ("<dist>", py_path)
+    elif _is_stdlib_path(py_path):
+        return ("<py>", py_path)
+    elif py_path.startswith(pwd):
+        return ("<pwd>", pwd)
+
+    return None
+
+
+def with_trailing_slash(py_path: str) -> str:
+    # Always end paths with a slash. This way relative paths don't
+    # start with a / and tooling can open files (e.g. Ctrl+Click),
+    # which would otherwise be parsed as absolute paths.
+    if not py_path.endswith("/"):
+        return py_path + "/"
+    return py_path
+
+
+def named_alias_prefixes(py_paths: list[str], pwd: str) -> AliasPrefixes:
+    """All well-known aliases for `py_paths`, in the order of `py_paths`."""
+    prefixes: AliasPrefixes = []
+    seen: set[str] = set()
+    for py_path in py_paths:
+        named = named_alias(py_path, pwd)
+        if named is None:
+            continue
+
+        alias, prefix = named[0], with_trailing_slash(named[1])
+        if prefix not in seen:
+            seen.add(prefix)
+            prefixes.append((alias, prefix))
+
+    return prefixes
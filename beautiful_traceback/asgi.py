@@ -0,0 +1,158 @@
+"""ASGI middleware logging unhandled exceptions without blocking the event loop.
+
+Rendering a traceback computes path aliases, checks paths on disk and reads
+source lines, which would stall every other request on the loop. The
+middleware only takes a snapshot of the exception inline, without source
+lines or references to frames, and renders it in a small thread pool. The
+exception is re-raised right away, so the server still sends its error
+response.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import typing as typ
+
+from beautiful_traceback import config
+from beautiful_traceback import formatting as fmt
+from beautiful_traceback.common import ExceptionTraceback
+
+Scope = typ.MutableMapping[str, typ.Any]
+ASGIApp = typ.Callable[..., typ.Awaitable[None]]
+
+logger = logging.getLogger(__name__)
+
+
+def _describe_request(scope: Scope) -> str:
+    path = scope.get("path", "")
+    if scope["type"] == "websocket":
+        return f"websocket {path}"
+    return f"{scope.get('method', 'GET')} {path}"
+
+
+class BeautifulTracebackMiddleware:
+    """Log exceptions escaping `app`, rendered off the event loop.
+
+    Each exception is logged to `logger` as an error with the rendered
+    traceback. With `json`, the `tracebacks_to_json` form is attached as the
+    `traceback` attribute of the log record, for structured log handlers.
+
+    Renders run on `max_workers` threads. When `max_pending` renders are
+    already queued, for example during a burst of errors, further exceptions
+    are only logged with their one-line message.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        local_stack_only: bool | None = None,
+        exclude_patterns: typ.Sequence[str] | None = None,
+        show_aliases: bool | None = None,
+        json: bool = False,
+        max_workers: int = 1,
+        max_pending: int = 100,
+        logger: logging.Logger = logger,
+    ) -> None:
+        self.app = app
+        self.local_stack_only = (
+            local_stack_only
+            if local_stack_only is not None
+            else config.get_default("local_stack_only", False)
+        )
+        self.exclude_patterns = (
+            exclude_patterns
+            if exclude_patterns is not None
+            else config.get_default("exclude_patterns", ())
+        )
+        self.show_aliases = (
+            show_aliases
+            if show_aliases is not None
+            else config.get_default("show_aliases", True)
+        )
+        self.json = json
+        self.max_pending = max_pending
+        self.logger = logger
+        self.pending = 0
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers, thread_name_prefix="beautiful-traceback-render"
+        )
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: typ.Callable[[], typ.Awaitable[typ.Any]],
+        send: typ.Callable[[typ.Any], typ.Awaitable[None]],
+    ) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception as exc:
+            self._report(scope, exc)
+            raise
+
+    def _report(self, scope: Scope, exc: Exception) -> None:
+        request = _describe_request(scope)
+        if self.pending >= self.max_pending:
+            self.logger.error(
+                "Exception in ASGI application (%s), %d tracebacks pending: %s: %s",
+                request,
+                self.pending,
+                type(exc).__name__,
+                exc,
+            )
+            return
+
+        # NOTE: This runs in the handler of the application's exception, an
+        #   error raised here would replace it. E.g. after close() the
+        #   executor refuses new renders.
+        try:
+            # the only work done on the loop: frames are walked, nothing is read
+            tracebacks = fmt.exc_to_tracebacks(
+                exc, fmt.get_tb_attr(exc), with_source=False
+            )
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, self._render, request, tracebacks
+            )
+        except Exception:
+            self.logger.exception(
+                "Exception in ASGI application (%s), reporting it failed", request
+            )
+            return
+
+        self.pending += 1
+        future.add_done_callback(self._rendered)
+
+    def _rendered(self, future: asyncio.Future) -> None:
+        self.pending -= 1
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(
+                "Rendering a traceback failed", exc_info=future.exception()
+            )
+
+    def _render(self, request: str, tracebacks: list[ExceptionTraceback]) -> None:
+        tracebacks = fmt.load_sources(tracebacks)
+        text = fmt.format_tracebacks(
+            tracebacks,
+            local_stack_only=self.local_stack_only,
+            exclude_patterns=self.exclude_patterns,
+            show_aliases=self.show_aliases,
+        )
+
+        extra = {}
+        if self.json:
+            from beautiful_traceback.json_formatting import tracebacks_to_json
+
+            extra["traceback"] = tracebacks_to_json(
+                tracebacks, self.local_stack_only, self.exclude_patterns
+            )
+
+        self.logger.error(
+            "Exception in ASGI application (%s)\n%s", request, text, extra=extra
+        )
+
+    def close(self) -> None:
+        """Wait for pending renders and stop the render threads."""
+        self._executor.shutdown(wait=True)
@@ -61,12 +61,15 @@ def _create_injection_files(py_file: Path, pth_file: Path) -> None:
         finally:
             colorama.deinit()
 
+    # only trampolines are installed at startup, the real hook is set up on
+    # the first uncaught exception
     py_content = """def run_startup_script():
   try:
-    import beautiful_traceback
-    beautiful_traceback.install(only_tty=False)
+    from beautiful_traceback import trampoline
   except ImportError:
-    pass
+    return
+
+  trampoline.install_deferred(only_tty=False)
 
 run_startup_script()
 """
@@ -12,6 +12,26 @@ These structures:
 
 import typing as typ
 
+# headers live in `constants` so the emergency writer can use them without
+# importing typing, they are re-exported here for the renderers
+from beautiful_traceback.constants import (
+    ALIASES_HEAD,
+    CAUSE_HEAD,
+    CONTEXT_HEAD,
+    TRACEBACK_HEAD,
+)
+
+__all__ = [
+    "ALIASES_HEAD",
+    "CAUSE_HEAD",
+    "CONTEXT_HEAD",
+    "TRACEBACK_HEAD",
+    "ExceptionTraceback",
+    "ExceptionTracebackList",
+    "StackFrameEntry",
+    "StackFrameEntryList",
+]
+
 
 class StackFrameEntry(typ.NamedTuple):
     """A normalized stack frame.
@@ -55,16 +75,3 @@ class ExceptionTraceback(typ.NamedTuple):
 
 
 ExceptionTracebackList = list[ExceptionTraceback]
-
-# Standard headers used across different renderers
-ALIASES_HEAD = "Aliases for entries in sys.path:"
-"Header shown before the list of path aliases."
-
-TRACEBACK_HEAD = "Traceback (most recent call last):"
-"Standard Python header for a traceback."
-
-CAUSE_HEAD = "The above exception was the direct cause of the following exception:"
-"Header shown when an exception has an explicit __cause__."
-
-CONTEXT_HEAD = "During handling of the above exception, another exception occurred:"
-"Header shown when an exception has an implicit __context__."
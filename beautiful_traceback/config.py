@@ -1,5 +1,10 @@
+from __future__ import annotations
+
 import os
-import typing as typ
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import typing as typ
 
 _PREFIX = "BEAUTIFUL_TRACEBACK_"
 _TRUTHY = frozenset({"1", "true", "yes", "on"})
@@ -17,14 +22,28 @@ def env_bool(name: str, default: bool) -> bool:
     return default
 
 
+def env_float(name: str, default: float | None) -> float | None:
+    val = os.environ.get(_PREFIX + name, "").strip()
+    if not val:
+        return default
+    try:
+        return float(val)
+    except ValueError:
+        return default
+
+
 def configure(
     local_stack_only: bool | None = None,
     exclude_patterns: typ.Sequence[str] | None = None,
     show_aliases: bool | None = None,
+    format_timeout: float | None = None,
 ) -> None:
     """Set global defaults for traceback formatting helpers.
 
     Per-call arguments always override these defaults.
+
+    `format_timeout` is the time budget in seconds for rendering a single
+    traceback. When it is exceeded, output degrades to the stdlib renderer.
     """
     if local_stack_only is not None:
         _config["local_stack_only"] = local_stack_only
@@ -32,6 +51,8 @@ def configure(
         _config["exclude_patterns"] = exclude_patterns
     if show_aliases is not None:
         _config["show_aliases"] = show_aliases
+    if format_timeout is not None:
+        _config["format_timeout"] = format_timeout
 
 
 def get_config() -> dict[str, typ.Any]:
@@ -41,3 +62,7 @@ def get_config() -> dict[str, typ.Any]:
 
 def get_default(key: str, fallback: typ.Any) -> typ.Any:
     return _config.get(key, fallback)
+
+
+def get_format_timeout() -> float | None:
+    return get_default("format_timeout", env_float("FORMAT_TIMEOUT", None))
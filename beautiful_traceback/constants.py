@@ -0,0 +1,16 @@
+"""Text constants shared by the renderers.
+
+This module has no imports, the emergency writer relies on it at startup.
+"""
+
+ALIASES_HEAD = "Aliases for entries in sys.path:"
+"Header shown before the list of path aliases."
+
+TRACEBACK_HEAD = "Traceback (most recent call last):"
+"Standard Python header for a traceback."
+
+CAUSE_HEAD = "The above exception was the direct cause of the following exception:"
+"Header shown when an exception has an explicit __cause__."
+
+CONTEXT_HEAD = "During handling of the above exception, another exception occurred:"
+"Header shown when an exception has an implicit __context__."
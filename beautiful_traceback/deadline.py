@@ -0,0 +1,120 @@
+"""Time budget for traceback formatting with a stdlib fallback.
+
+Formatting runs inside excepthooks and logging handlers, so a pathological
+traceback (slow network filesystem, enormous message, huge sys.path) must not
+stall the caller. The formatting pipeline calls `check()` between its
+expensive steps. Once the budget is spent, or when formatting raises,
+`render_with_fallback` degrades to `traceback.format_exception` and, if even
+that fails, to a minimal one-line form.
+"""
+
+import threading
+import time
+import traceback as tb
+import types
+import typing as typ
+
+
+class FormattingTimeout(Exception):
+    """Raised inside the formatting pipeline once the time budget is spent."""
+
+
+_local = threading.local()
+
+_stats_lock = threading.Lock()
+_stats: dict[str, int] = {
+    "formatted": 0,
+    "timeout_fallbacks": 0,
+    "error_fallbacks": 0,
+    "minimal_fallbacks": 0,
+}
+
+
+def _count(key: str) -> None:
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def get_formatting_stats() -> dict[str, int]:
+    """Retrieve a copy of the formatting counters.
+
+    Keys:
+        formatted: Tracebacks rendered by beautiful_traceback.
+        timeout_fallbacks: Renders that exceeded the time budget.
+        error_fallbacks: Renders that raised an exception.
+        minimal_fallbacks: Fallbacks where the stdlib renderer also failed and
+            the one-line form was used.
+    """
+    with _stats_lock:
+        return _stats.copy()
+
+
+def reset_formatting_stats() -> None:
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def check() -> None:
+    """Raise FormattingTimeout when the current thread's budget is spent."""
+    deadline = getattr(_local, "deadline", None)
+    if deadline is not None and time.monotonic() >= deadline:
+        raise FormattingTimeout()
+
+
+def _minimal_form(exc_value: BaseException) -> str:
+    try:
+        exc_msg = str(exc_value)
+    except Exception:
+        exc_msg = "<exception str() failed>"
+
+    exc_name = type(exc_value).__name__
+    if not exc_msg:
+        return exc_name
+
+    return f"{exc_name}: {exc_msg}"
+
+
+def _stdlib_form(
+    exc_value: BaseException, traceback: types.TracebackType | None
+) -> str:
+    try:
+        lines = tb.format_exception(type(exc_value), exc_value, traceback)
+        return "".join(lines).strip()
+    except Exception:
+        _count("minimal_fallbacks")
+        return _minimal_form(exc_value)
+
+
+def render_with_fallback(
+    render: typ.Callable[[], str],
+    exc_value: BaseException,
+    traceback: types.TracebackType | None,
+    timeout: float | None,
+) -> str:
+    """Call `render` within `timeout` seconds, falling back to the stdlib.
+
+    A `timeout` of None disables the budget, but exceptions raised while
+    rendering still fall back. Nested calls never extend an outer budget.
+    """
+    previous_deadline: float | None = getattr(_local, "deadline", None)
+    deadline = previous_deadline
+    if timeout is not None:
+        deadline = time.monotonic() + timeout
+        if previous_deadline is not None:
+            deadline = min(deadline, previous_deadline)
+
+    _local.deadline = deadline
+    try:
+        result = render()
+    except FormattingTimeout:
+        _count("timeout_fallbacks")
+    except Exception:
+        _count("error_fallbacks")
+    else:
+        _count("formatted")
+        return result
+    finally:
+        _local.deadline = previous_deadline
+
+    return _stdlib_form(exc_value, traceback)
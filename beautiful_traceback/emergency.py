@@ -0,0 +1,216 @@
+"""Low-allocation traceback writer for MemoryError and RecursionError.
+
+The regular pipeline builds lists, f-strings and colored lines for every
+frame, which is exactly what fails when the process is out of memory or the
+stack is already near its limit. This writer walks the traceback in place,
+copies short pieces into a preallocated buffer and hands it straight to the
+stderr file descriptor with `os.write`. Only the top and bottom frames are
+printed, using an alias table computed ahead of time by `prime()`.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+
+from beautiful_traceback import aliases
+from beautiful_traceback.constants import ALIASES_HEAD, TRACEBACK_HEAD
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import types
+
+EMERGENCY_TYPES: tuple[type[BaseException], ...] = (MemoryError, RecursionError)
+"Exception types routed to the emergency writer by the excepthook."
+
+HEAD_FRAMES = 3
+"Outermost frames printed by the emergency writer."
+
+TAIL_FRAMES = 5
+"Innermost frames printed by the emergency writer."
+
+MAX_MESSAGE_LEN = 500
+"Exception messages are truncated to this many characters."
+
+_BUFFER_SIZE = 16 * 1024
+_buffer = bytearray(_BUFFER_SIZE)
+_view = memoryview(_buffer)
+_pos = 0
+
+# NOTE: released on MemoryError so the writer has some headroom to work with
+_RESERVE_SIZE = 256 * 1024
+_reserve: bytearray | None = bytearray(_RESERVE_SIZE)
+
+_lock = threading.Lock()
+_aliases: aliases.AliasPrefixes = []
+
+
+def prime() -> None:
+    """Precompute the alias table and restore the memory reserve.
+
+    Called by `install()` so the emergency path never has to scan sys.path.
+    """
+    global _aliases, _reserve
+
+    _aliases = aliases.named_alias_prefixes(
+        aliases.sorted_py_paths(sys.path), os.getcwd()
+    )
+    if _reserve is None:
+        _reserve = bytearray(_RESERVE_SIZE)
+
+
+def _stderr_fd() -> int | None:
+    try:
+        sys.stderr.flush()
+        return sys.stderr.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _flush(fd: int | None) -> None:
+    global _pos
+
+    if fd is None:
+        # stderr isn't backed by a file descriptor (e.g. redirected in tests)
+        try:
+            sys.stderr.write(_buffer[:_pos].decode("utf-8", "replace"))
+            sys.stderr.flush()
+        except (AttributeError, OSError, ValueError):
+            pass
+        _pos = 0
+        return
+
+    written = 0
+    while written < _pos:
+        try:
+            written += os.write(fd, _view[written:_pos])
+        except InterruptedError:
+            continue
+        except OSError:
+            break
+    _pos = 0
+
+
+def _write(text: str, fd: int | None) -> None:
+    global _pos
+
+    data = text.encode("utf-8", "replace")
+    if len(data) > _BUFFER_SIZE - _pos:
+        _flush(fd)
+        data = data[:_BUFFER_SIZE]
+
+    end = _pos + len(data)
+    _view[_pos:end] = data
+    _pos = end
+
+
+def _alias_index(filename: str) -> int:
+    for index, (_alias, prefix) in enumerate(_aliases):
+        if filename.startswith(prefix):
+            return index
+    return -1
+
+
+def _is_printed(index: int, depth: int) -> bool:
+    return index < HEAD_FRAMES or index >= depth - TAIL_FRAMES
+
+
+def _write_frame(code: types.CodeType, lineno: int | None, fd: int | None) -> None:
+    filename = code.co_filename
+    index = _alias_index(filename)
+
+    _write("    ", fd)
+    if index >= 0:
+        alias, prefix = _aliases[index]
+        _write(alias, fd)
+        _write(" ", fd)
+        _write(filename[len(prefix) :], fd)
+    else:
+        _write(filename, fd)
+    _write(":", fd)
+    _write(str(lineno), fd)
+    _write("  ", fd)
+    _write(code.co_name, fd)
+    _write("\n", fd)
+
+
+def _write_message(exc_value: BaseException, fd: int | None) -> None:
+    try:
+        exc_msg = str(exc_value)
+    except Exception:
+        exc_msg = "<exception str() failed>"
+
+    if exc_msg:
+        _write(": ", fd)
+        _write(exc_msg[:MAX_MESSAGE_LEN], fd)
+
+
+def write_emergency(
+    exc_type: type[BaseException],
+    exc_value: BaseException,
+    traceback: types.TracebackType | None,
+    thread: threading.Thread | None = None,
+) -> None:
+    """Write a compact, aliased top/bottom frame summary to stderr."""
+    global _reserve
+
+    if issubclass(exc_type, MemoryError):
+        _reserve = None
+
+    with _lock:
+        fd = _stderr_fd()
+
+        if thread is not None:
+            _write("Exception in thread ", fd)
+            _write(thread.name, fd)
+            _write(" (daemon):\n" if thread.daemon else ":\n", fd)
+
+        depth = 0
+        cur = traceback
+        while cur is not None:
+            depth += 1
+            cur = cur.tb_next
+
+        # bitmask of the aliases used by the frames we are going to print
+        used_aliases = 0
+        index = 0
+        cur = traceback
+        while cur is not None:
+            if _is_printed(index, depth):
+                alias_index = _alias_index(cur.tb_frame.f_code.co_filename)
+                if alias_index >= 0:
+                    used_aliases |= 1 << alias_index
+            index += 1
+            cur = cur.tb_next
+
+        if used_aliases:
+            _write(ALIASES_HEAD, fd)
+            _write("\n", fd)
+            for alias_index, (alias, prefix) in enumerate(_aliases):
+                if used_aliases & (1 << alias_index):
+                    _write("    ", fd)
+                    _write(alias, fd)
+                    _write(": ", fd)
+                    _write(prefix, fd)
+                    _write("\n", fd)
+
+        _write(TRACEBACK_HEAD, fd)
+        _write("\n", fd)
+
+        index = 0
+        cur = traceback
+        while cur is not None:
+            if _is_printed(index, depth):
+                _write_frame(cur.tb_frame.f_code, cur.tb_lineno, fd)
+            elif index == HEAD_FRAMES:
+                _write("    ... ", fd)
+                _write(str(depth - HEAD_FRAMES - TAIL_FRAMES), fd)
+                _write(" frames omitted\n", fd)
+            index += 1
+            cur = cur.tb_next
+
+        _write(exc_type.__name__, fd)
+        _write_message(exc_value, fd)
+        _write("\n", fd)
+        _flush(fd)
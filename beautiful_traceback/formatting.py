@@ -1,4 +1,5 @@
 import collections
+import linecache
 import logging
 import os
 import re
@@ -10,6 +11,9 @@ import typing as typ
 
 import colorama
 
+from beautiful_traceback import aliases as path_aliases
+from beautiful_traceback import config, deadline, frame_filter
+from beautiful_traceback.aliases import AliasPrefix, AliasPrefixes
 from beautiful_traceback.common import (
     ALIASES_HEAD,
     CAUSE_HEAD,
@@ -88,13 +92,6 @@ class PaddedRow(typ.NamedTuple):
     context: str
 
 
-Alias = str
-Prefix = str
-
-AliasPrefix = tuple[Alias, Prefix]
-AliasPrefixes = list[AliasPrefix]
-
-
 class Context(typ.NamedTuple):
     rows: list[Row]
     aliases: AliasPrefixes
@@ -113,6 +110,7 @@ class Context(typ.NamedTuple):
 
 def _iter_entry_paths(entries: StackFrameEntryList) -> typ.Iterable[str]:
     for entry in entries:
+        deadline.check()
         module_abspath = os.path.abspath(entry.module)
         is_valid_abspath = module_abspath != entry.module and os.path.exists(
             module_abspath
@@ -129,13 +127,22 @@ TEST_PATHS: list[str] = []
 PWD = os.getcwd()
 
 
+_compiled_exclude_patterns: dict[tuple[str, ...], list[re.Pattern[str]]] = {}
+
+
 def _compile_exclude_patterns(
     exclude_patterns: typ.Sequence[str],
 ) -> list[re.Pattern[str]]:
     if not exclude_patterns:
         return []
 
-    return [re.compile(pattern) for pattern in exclude_patterns]
+    key = tuple(exclude_patterns)
+    compiled = _compiled_exclude_patterns.get(key)
+    if compiled is None:
+        compiled = [re.compile(pattern) for pattern in key]
+        _compiled_exclude_patterns[key] = compiled
+
+    return compiled
 
 
 def _row_matches_exclude_patterns(
@@ -172,30 +179,28 @@ def _row_matches_exclude_patterns(
     return False
 
 
+# sys.path snapshot and its entries sorted for alias lookups
+_py_paths_cache: tuple[tuple[str, ...], list[str]] = ((), [])
+
+
 def _py_paths() -> list[str]:
+    global _py_paths_cache
+
     if TEST_PATHS:
         return TEST_PATHS
 
-    # NOTE (mb 2020-08-16): We don't know which path entry
-    #   was used to import a module. I guess we could figure it
-    #   out, but the preference here is to make the shortest
-    #   path possible.
-
-    paths = list(sys.path)
-    # NOTE (mb 2020-10-04): aliases must be sorted from longest to
-    #   shortest, so that the longer matches are used first.
-    paths.sort(key=len, reverse=True)
+    key = tuple(sys.path)
+    if _py_paths_cache[0] != key:
+        _py_paths_cache = (key, path_aliases.sorted_py_paths(sys.path))
 
-    if "" in paths:
-        paths.remove("")
-
-    return paths
+    return _py_paths_cache[1]
 
 
 def _iter_used_py_paths(entry_paths: list[str]) -> typ.Iterable[str]:
     _uniq_entry_paths = set(entry_paths)
 
     for py_path in _py_paths():
+        deadline.check()
         is_path_used = False
         for entry_path in list(_uniq_entry_paths):
             if entry_path.startswith(py_path):
@@ -206,32 +211,23 @@ def _iter_used_py_paths(entry_paths: list[str]) -> typ.Iterable[str]:
             yield py_path
 
 
+def named_alias_prefixes() -> AliasPrefixes:
+    """All well-known aliases for the current sys.path, longest prefix first."""
+    return path_aliases.named_alias_prefixes(_py_paths(), PWD)
+
+
 def _iter_alias_prefixes(entry_paths: list[str]) -> typ.Iterable[AliasPrefix]:
     alias_index = 0
 
     for py_path in _iter_used_py_paths(entry_paths):
-        if py_path.endswith("site-packages"):
-            alias = "<site>"
-        elif py_path.endswith("dist-packages"):
-            alias = "<dist>"
-        elif re.search(r"lib/python\d.\d+$", py_path):
-            alias = "<py>"
-        elif re.search(r"lib/Python\d.\d+\\lib$", py_path):
-            alias = "<py>"
-        elif py_path.startswith(PWD):
-            alias = "<pwd>"
-            py_path = PWD
-        else:
+        named = path_aliases.named_alias(py_path, PWD)
+        if named is None:
             alias = f"<p{alias_index}>"
             alias_index += 1
+        else:
+            alias, py_path = named
 
-        # Always end paths with a slash. This way relative paths don't
-        # start with a / and tooling can open files (e.g. Ctrl+Click),
-        # which would otherwise be parsed as absolute paths.
-        if not py_path.endswith("/"):
-            py_path = py_path + "/"
-
-        yield (alias, py_path)
+        yield (alias, path_aliases.with_trailing_slash(py_path))
 
 
 def _iter_entry_rows(
@@ -427,15 +423,59 @@ def _rows_to_lines(
             yield line
 
 
-def _traceback_to_entries(traceback: types.TracebackType) -> StackFrameEntryList:
-    summary = tb.extract_tb(traceback)
+def _traceback_to_entries(
+    traceback: types.TracebackType,
+    hide_framework_frames: bool = False,
+    with_source: bool = True,
+) -> StackFrameEntryList:
+    walked = list(tb.walk_tb(traceback))
+    return _frames_to_entries(
+        frame_filter.visible_frames(walked, hide_framework_frames), with_source
+    )
+
+
+def stack_to_entries(
+    frame: types.FrameType, hide_framework_frames: bool = False
+) -> StackFrameEntryList:
+    """Entries of the live stack ending in `frame`, outermost call first."""
+    walked = list(tb.walk_stack(frame))
+    walked.reverse()
+    return _frames_to_entries(
+        frame_filter.visible_frames(walked, hide_framework_frames)
+    )
+
+
+def _frames_to_entries(
+    walked: list[tuple[types.FrameType, int | None]],
+    with_source: bool = True,
+) -> StackFrameEntryList:
+    # NOTE: This mirrors traceback.extract_tb, but source lines are looked up
+    #   one frame at a time so a slow filesystem can't blow the time budget.
+    frames: list[tuple[str, str, int | None]] = []
+    filenames: set[str] = set()
+    for frame, lineno in walked:
+        deadline.check()
+        module = frame.f_code.co_filename
+        frames.append((module, frame.f_code.co_name, lineno))
+        if module not in filenames:
+            filenames.add(module)
+            linecache.lazycache(module, frame.f_globals)
+
+    if not with_source:
+        return [
+            StackFrameEntry(module, call, str(lineno), "")
+            for module, call, lineno in frames
+        ]
+
+    for module in filenames:
+        deadline.check()
+        linecache.checkcache(module)
+
     entries = []
-    for entry in summary:
-        module = entry[0]
-        call = entry[2]
-        lineno = str(entry[1])
-        context = entry[3] or ""
-        entries.append(StackFrameEntry(module, call, lineno, context))
+    for module, call, lineno in frames:
+        deadline.check()
+        context = linecache.getline(module, lineno).strip() if lineno else ""
+        entries.append(StackFrameEntry(module, call, str(lineno), context))
     return entries
 
 
@@ -490,9 +530,11 @@ def format_traceback(
     local_stack_only: bool = False,
     exclude_patterns: typ.Sequence[str] = (),
     show_aliases: bool = True,
+    term_width: int | None = None,
 ) -> str:
     ctx = _init_entries_context(
         traceback.stack_frames,
+        term_width=term_width,
         exclude_patterns=exclude_patterns,
     )
     return _format_traceback(ctx, traceback, color, local_stack_only, show_aliases)
@@ -504,6 +546,7 @@ def format_tracebacks(
     local_stack_only: bool = False,
     exclude_patterns: typ.Sequence[str] = (),
     show_aliases: bool = True,
+    term_width: int | None = None,
 ) -> str:
     traceback_strs: list[str] = []
 
@@ -521,6 +564,7 @@ def format_tracebacks(
             local_stack_only,
             exclude_patterns=exclude_patterns,
             show_aliases=show_aliases,
+            term_width=term_width,
         )
         traceback_strs.append(traceback_str)
 
@@ -531,15 +575,21 @@ def get_tb_attr(ex: BaseException) -> types.TracebackType:
     return typ.cast(types.TracebackType, getattr(ex, "__traceback__", None))
 
 
-def exc_to_traceback_str(
+def exc_to_tracebacks(
     exc_value: BaseException,
     traceback: types.TracebackType,
-    color: bool = False,
-    local_stack_only: bool = False,
     exc_msg_override: str | None = None,
-    exclude_patterns: typ.Sequence[str] = (),
-    show_aliases: bool = True,
-) -> str:
+    hide_framework_frames: bool = False,
+    with_source: bool = True,
+) -> list[ExceptionTraceback]:
+    """Flatten an exception and its chain into the IR, outermost cause first.
+
+    The result holds no references to frames, so it can be kept around and
+    rendered later with `format_tracebacks`. With `hide_framework_frames`,
+    pytest and pluggy frames are left out, see `frame_filter`. Without
+    `with_source`, source lines are left empty to be read later (e.g. off an
+    event loop) with `load_sources`.
+    """
     # NOTE (mb 2020-08-13): wrt. cause vs context see
     #   https://www.python.org/dev/peps/pep-3134/#enhanced-reporting
     #   https://stackoverflow.com/questions/11235932/
@@ -569,7 +619,9 @@ def exc_to_traceback_str(
         tb_tup = ExceptionTraceback(
             exc_name=type(cur_exc_value).__name__,
             exc_msg=exc_msg,
-            stack_frames=_traceback_to_entries(cur_traceback),
+            stack_frames=_traceback_to_entries(
+                cur_traceback, hide_framework_frames, with_source
+            ),
             is_caused=bool(next_cause),
             is_context=bool(next_context),
         )
@@ -585,10 +637,40 @@ def exc_to_traceback_str(
         else:
             break
 
-    tracebacks = list(reversed(tracebacks))
+    return list(reversed(tracebacks))
 
+
+def load_sources(tracebacks: list[ExceptionTraceback]) -> list[ExceptionTraceback]:
+    """Fill in the source lines of IR taken with `with_source=False`."""
+    for module in {
+        entry.module for tb_tup in tracebacks for entry in tb_tup.stack_frames
+    }:
+        deadline.check()
+        linecache.checkcache(module)
+
+    loaded = []
+    for tb_tup in tracebacks:
+        entries = []
+        for entry in tb_tup.stack_frames:
+            deadline.check()
+            lineno = int(entry.lineno) if entry.lineno.isdigit() else 0
+            context = linecache.getline(entry.module, lineno).strip() if lineno else ""
+            entries.append(entry._replace(src_ctx=context))
+        loaded.append(tb_tup._replace(stack_frames=entries))
+    return loaded
+
+
+def exc_to_traceback_str(
+    exc_value: BaseException,
+    traceback: types.TracebackType,
+    color: bool = False,
+    local_stack_only: bool = False,
+    exc_msg_override: str | None = None,
+    exclude_patterns: typ.Sequence[str] = (),
+    show_aliases: bool = True,
+) -> str:
     return format_tracebacks(
-        tracebacks,
+        exc_to_tracebacks(exc_value, traceback, exc_msg_override),
         color,
         local_stack_only,
         exclude_patterns=exclude_patterns,
@@ -602,7 +684,12 @@ class LoggingFormatterMixin:
 
     def formatException(self, ei) -> str:
         _, exc_value, traceback = ei
-        return exc_to_traceback_str(exc_value, traceback, color=True)
+        return deadline.render_with_fallback(
+            lambda: exc_to_traceback_str(exc_value, traceback, color=True),
+            exc_value,
+            traceback,
+            config.get_format_timeout(),
+        )
 
 
 class LoggingFormatter(LoggingFormatterMixin, logging.Formatter):
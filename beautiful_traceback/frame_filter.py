@@ -0,0 +1,115 @@
+"""Frame filters applied while a traceback is walked.
+
+Unlike `exclude_patterns`, which are matched against the rendered rows, these
+filters look at the frame objects themselves. Their verdicts mostly depend on
+the code object, so they are computed once per code object and cached.
+"""
+
+import types
+import typing as typ
+import weakref
+
+FRAMEWORK_PACKAGES = frozenset({"_pytest", "pytest", "pluggy"})
+"Top level packages whose frames are hidden by `hide_framework_frames`."
+
+HIDE_MARKER = "__tracebackhide__"
+"pytest's convention for helpers that should not show up in tracebacks."
+
+_framework_verdicts: "weakref.WeakKeyDictionary[types.CodeType, bool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+_NOT_LOCAL = "not local"
+"The code never assigns the marker, only the module globals can set it."
+
+_DYNAMIC = "dynamic"
+"The value assigned to the marker is computed, it's read from each frame."
+
+_local_markers: "weakref.WeakKeyDictionary[types.CodeType, bool | str]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def is_framework_frame(frame: types.FrameType) -> bool:
+    """True for frames executing code of the test framework (pytest, pluggy)."""
+    code = frame.f_code
+    verdict = _framework_verdicts.get(code)
+    if verdict is None:
+        module_name = frame.f_globals.get("__name__") or ""
+        verdict = module_name.partition(".")[0] in FRAMEWORK_PACKAGES
+        _framework_verdicts[code] = verdict
+    return verdict
+
+
+def _static_local_marker(code: types.CodeType) -> bool | str:
+    if HIDE_MARKER not in code.co_varnames:
+        return _NOT_LOCAL
+
+    import dis
+
+    values = set()
+    previous = None
+    for instruction in dis.get_instructions(code):
+        if instruction.opname == "STORE_FAST" and instruction.argval == HIDE_MARKER:
+            # `__tracebackhide__ = True` compiles to LOAD_CONST + STORE_FAST
+            if previous is None or previous.opname != "LOAD_CONST":
+                return _DYNAMIC
+            values.add(previous.argval)
+        elif HIDE_MARKER in instruction.argrepr:
+            # any other use (del, combined stores, ...) is left to the frame
+            if not instruction.opname.startswith("LOAD_"):
+                return _DYNAMIC
+        previous = instruction
+
+    if len(values) != 1:
+        return _DYNAMIC
+
+    return _marker_hides(values.pop())
+
+
+def _marker_hides(value: object) -> bool:
+    # pytest also accepts a callable taking its ExceptionInfo, which isn't
+    # available here, such frames are shown
+    return bool(value) and not callable(value)
+
+
+def is_hidden_frame(frame: types.FrameType) -> bool:
+    """True for frames marked with `__tracebackhide__`, in locals or globals.
+
+    Reading `f_locals` is only needed for code that computes the marker, a
+    constant assignment is found once per code object from its bytecode.
+    """
+    code = frame.f_code
+    marker = _local_markers.get(code)
+    if marker is None:
+        marker = _static_local_marker(code)
+        _local_markers[code] = marker
+
+    if marker is _DYNAMIC:
+        value = frame.f_locals.get(HIDE_MARKER, _NOT_LOCAL)
+        if value is not _NOT_LOCAL:
+            return _marker_hides(value)
+    elif marker is not _NOT_LOCAL:
+        return bool(marker)
+
+    return _marker_hides(frame.f_globals.get(HIDE_MARKER, False))
+
+
+def visible_frames(
+    frames: typ.Sequence[tuple[types.FrameType, int | None]],
+    hide_framework_frames: bool = False,
+) -> list[tuple[types.FrameType, int | None]]:
+    """Drop hidden frames from `frames`, as yielded by `traceback.walk_tb`.
+
+    Frames marked with `__tracebackhide__` are always dropped, framework
+    frames only with `hide_framework_frames`. When every frame would be
+    dropped, e.g. for an error raised by pytest itself, all of them are kept
+    since they are the only useful context.
+    """
+    visible = [
+        entry
+        for entry in frames
+        if not is_hidden_frame(entry[0])
+        and not (hide_framework_frames and is_framework_frame(entry[0]))
+    ]
+    return visible or list(frames)
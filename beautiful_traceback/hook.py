@@ -1,19 +1,37 @@
-import inspect
-import logging
+"""sys.excepthook, threading.excepthook and asyncio loop exception integration.
+
+This module is imported on interpreter startup when the .pth injection is
+used, so it only depends on lightweight modules. The formatting machinery
+(colorama, logging, subprocess, inspect, re, ...) is imported the first time
+an exception is actually formatted.
+"""
+
+from __future__ import annotations
+
+import atexit
 import os
 import sys
 import threading
-import types
-import typing as typ
 
-import colorama
+from beautiful_traceback import config, emergency, output, policy, trampoline
 
-from beautiful_traceback import config, formatting
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import asyncio
+    import types
+    import typing as typ
+    import weakref
 
-log = logging.getLogger(__name__)
+
+def _log_info(msg: str, *args: typ.Any) -> None:
+    import logging
+
+    logging.getLogger(__name__).info(msg, *args)
 
 
 def _source_location(func: typ.Callable) -> str:
+    import inspect
+
     try:
         file = inspect.getfile(func)
         _, line = inspect.getsourcelines(func)
@@ -24,46 +42,225 @@ def _source_location(func: typ.Callable) -> str:
 
 def _format_thread_header(thread: threading.Thread, color: bool) -> str:
     daemon_suffix = " (daemon)" if thread.daemon else ""
-    text = f"Exception in thread {thread.name}{daemon_suffix}:\n"
+    return _color_header(f"Exception in thread {thread.name}{daemon_suffix}:\n", color)
+
+
+def _format_context_header(context: dict[str, typ.Any], color: bool) -> str:
+    message = context.get("message") or "Unhandled exception in event loop"
+    return _color_header(f"{message}:\n", color)
+
+
+def _context_source_name(context: dict[str, typ.Any]) -> str:
+    """Name of the task (or future, or callback) an asyncio error came from."""
+    for key in ("task", "future", "handle"):
+        source = context.get(key)
+        if source is None:
+            continue
+
+        get_name = getattr(source, "get_name", None)
+        return get_name() if get_name is not None else repr(source)
 
+    return str(context.get("message", "event loop"))
+
+
+def _format_task_origin(context: dict[str, typ.Any], color: bool, **options) -> str:
+    # only loaded once install_task_origins() was used
+    task_origins = sys.modules.get("beautiful_traceback.task_origins")
+    task = context.get("task") or context.get("future")
+    if task_origins is None or task is None:
+        return ""
+
+    return task_origins.format_task_origin(task, color, **options)
+
+
+def _color_header(text: str, color: bool) -> str:
     if not color:
         return text
 
+    import colorama
+
     return colorama.Fore.RED + colorama.Style.BRIGHT + text + colorama.Style.RESET_ALL
 
 
+def _silence_stdout() -> None:
+    # NOTE: Python flushes stdout again at shutdown, which raises another
+    #   BrokenPipeError. Pointing stdout at devnull avoids that second error.
+    #   https://docs.python.org/3/library/signal.html#note-on-sigpipe
+    try:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    except (AttributeError, OSError, ValueError):
+        pass
+
+
 def init_excepthook(
     color: bool,
     local_stack_only: bool,
     exclude_patterns: typ.Sequence[str],
     show_aliases: bool = False,
+    format_timeout: float | None = None,
+    policies: policy.PolicyTable | None = None,
+    writer: output.StderrWriter | None = None,
+    coalescer: output.ThreadStormCoalescer | None = None,
+    loop_coalescer: output.ThreadStormCoalescer | None = None,
 ) -> typ.Callable:
+    _writer = writer or output.StderrWriter()
+
     def excepthook(
         exc_type: type[BaseException],
         exc_value: BaseException,
         traceback: types.TracebackType,
         thread: threading.Thread | None = None,
+        context: dict[str, typ.Any] | None = None,
     ) -> None:
-        tb_str = (
-            formatting.exc_to_traceback_str(
-                exc_value,
-                traceback,
-                color,
-                local_stack_only,
-                exclude_patterns=exclude_patterns,
-                show_aliases=show_aliases,
-            )
-            + "\n"
-        )
+        mode = "full" if policies is None else policies.resolve(exc_type)
+
+        if mode == "silent":
+            if (
+                thread is None
+                and context is None
+                and issubclass(exc_type, BrokenPipeError)
+            ):
+                _silence_stdout()
+            return
+
+        # the full pipeline allocates too much for these, use the low-allocation path
+        if mode == "full" and issubclass(exc_type, emergency.EMERGENCY_TYPES):
+            # written piecewise, held so other reports can't land in between
+            with _writer.lock:
+                emergency.write_emergency(exc_type, exc_value, traceback, thread)
+            return
+
+        def render() -> str:
+            if mode == "compact":
+                tb_str = policy.format_compact(exc_type, exc_value, traceback)
+            elif mode == "message":
+                tb_str = policy.format_message(exc_type, exc_value, traceback)
+            else:
+                # only full tracebacks need the formatting machinery
+                from beautiful_traceback import deadline, formatting
+
+                tb_str = (
+                    deadline.render_with_fallback(
+                        lambda: formatting.exc_to_traceback_str(
+                            exc_value,
+                            traceback,
+                            color,
+                            local_stack_only,
+                            exclude_patterns=exclude_patterns,
+                            show_aliases=show_aliases,
+                        ),
+                        exc_value,
+                        traceback,
+                        format_timeout,
+                    )
+                    + "\n"
+                )
+
+            if context is not None:
+                tb_str = _format_context_header(context, color) + tb_str
+                if mode == "full":
+                    tb_str += _format_task_origin(
+                        context,
+                        color,
+                        local_stack_only=local_stack_only,
+                        exclude_patterns=exclude_patterns,
+                        show_aliases=show_aliases,
+                    )
+            elif thread is not None:
+                tb_str = _format_thread_header(thread, color) + tb_str
 
-        if thread is not None:
-            tb_str = _format_thread_header(thread, color) + tb_str
+            return tb_str
 
-        sys.stderr.write(tb_str)
+        if context is not None and loop_coalescer is not None:
+            fingerprint = output.fingerprint_exception(exc_type, exc_value, traceback)
+            loop_coalescer.submit(fingerprint, _context_source_name(context), render)
+            return
+
+        if thread is not None and coalescer is not None:
+            fingerprint = output.fingerprint_exception(exc_type, exc_value, traceback)
+            coalescer.submit(fingerprint, thread.name, render)
+            return
+
+        _writer.write(render())
 
     return excepthook
 
 
+def init_loop_exception_handler(excepthook: typ.Callable) -> typ.Callable:
+    """An asyncio loop exception handler rendering through `excepthook`.
+
+    Contexts without an exception are left to `loop.default_exception_handler`.
+    """
+
+    def loop_exception_handler(
+        loop: asyncio.AbstractEventLoop, context: dict[str, typ.Any]
+    ) -> None:
+        exc = context.get("exception")
+        if not isinstance(exc, BaseException):
+            loop.default_exception_handler(context)
+            return
+
+        excepthook(type(exc), exc, exc.__traceback__, context=context)
+
+    return loop_exception_handler
+
+
+_coalescer: output.ThreadStormCoalescer | None = None
+_loop_coalescer: output.ThreadStormCoalescer | None = None
+_loop_exception_handler: typ.Callable | None = None
+# loops _loop_exception_handler was set on, restored by uninstall()
+_handled_loops: weakref.WeakSet[asyncio.AbstractEventLoop] | None = None
+
+
+def _handle_loop(loop: asyncio.AbstractEventLoop) -> None:
+    import weakref
+
+    global _handled_loops
+    if _handled_loops is None:
+        _handled_loops = weakref.WeakSet()
+
+    loop.set_exception_handler(_loop_exception_handler)
+    _handled_loops.add(loop)
+
+
+def _set_loop_exception_handler(handler: typ.Callable) -> None:
+    import asyncio
+
+    global _loop_exception_handler
+    _loop_exception_handler = handler
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _handle_loop(loop)
+
+
+def _remove_loop_exception_handler() -> None:
+    global _loop_exception_handler, _handled_loops
+    if _handled_loops is not None:
+        for loop in list(_handled_loops):
+            if loop.get_exception_handler() is _loop_exception_handler:
+                loop.set_exception_handler(None)
+        _handled_loops = None
+    _loop_exception_handler = None
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """A new event loop, with the asyncio handler set by `install()` if any.
+
+    Pass it as `loop_factory` to `asyncio.run()` or `asyncio.Runner` for
+    loops created after `install(asyncio_exception_handler=True)`.
+    """
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    if _loop_exception_handler is not None:
+        _handle_loop(loop)
+    return loop
+
+
 def install(
     color: bool = True,
     only_tty: bool = True,
@@ -71,6 +268,10 @@ def install(
     local_stack_only: bool | None = None,
     exclude_patterns: typ.Sequence[str] | None = None,
     show_aliases: bool | None = None,
+    format_timeout: float | None = None,
+    policies: typ.Mapping[type[BaseException], policy.PolicyMode] | None = None,
+    thread_coalesce_window: float = 0.5,
+    asyncio_exception_handler: bool = False,
 ) -> None:
     """Hook the current excepthook to the beautiful_traceback.
 
@@ -80,6 +281,24 @@ def install(
     Color output respects the NO_COLOR environment variable
     (https://no-color.org/). If NO_COLOR is set (regardless of
     its value), color output will be disabled.
+
+    `format_timeout` bounds how long rendering a traceback may take, in
+    seconds. Past the budget, or if formatting raises, the stdlib renderer is
+    used instead. See `get_formatting_stats()` for fallback counts.
+
+    `policies` maps exception classes to a handling mode ("full", "compact",
+    "message" or "silent") and is merged over `policy.DEFAULT_POLICIES`, which
+    keeps Ctrl-C compact and silences BrokenPipeError. Lookups follow the MRO.
+
+    Identical tracebacks from threads dying within `thread_coalesce_window`
+    seconds of each other are rendered once and summarized with the names of
+    the other threads. Set it to 0 to render every thread.
+
+    With `asyncio_exception_handler`, errors reported to the asyncio loop
+    exception handler ("Task exception was never retrieved", failing
+    callbacks, ...) are rendered too. The handler is set on the running loop,
+    loops created later need `new_event_loop()` as their `loop_factory`.
+    Identical errors from many tasks are coalesced like those from threads.
     """
     if not config.env_bool("ENABLED", True):
         return
@@ -95,33 +314,40 @@ def install(
     if not isatty:
         color = False
 
+    # an explicit install() supersedes the deferred one from the .pth file
+    trampoline.remove()
+
     is_default_sys_hook = sys.excepthook == sys.__excepthook__
     if only_hook_if_default_excepthook and not is_default_sys_hook:
         return
 
     if not is_default_sys_hook:
-        log.info(
+        _log_info(
             "overriding non-default sys.excepthook: %s",
             _source_location(sys.excepthook),
         )
 
     is_default_thread_hook = threading.excepthook == threading.__excepthook__
     if not is_default_thread_hook:
-        log.info(
+        _log_info(
             "overriding non-default threading.excepthook: %s",
             _source_location(threading.excepthook),
         )
 
+    policy_table = policy.PolicyTable({**policy.DEFAULT_POLICIES, **(policies or {})})
+
     # configure settings passed to install globally to they stick around
     if (
         local_stack_only is not None
         or exclude_patterns is not None
         or show_aliases is not None
+        or format_timeout is not None
     ):
         config.configure(
             local_stack_only=local_stack_only,
             exclude_patterns=exclude_patterns,
             show_aliases=show_aliases,
+            format_timeout=format_timeout,
         )
 
     resolved_local_stack_only = config.get_default(
@@ -134,11 +360,32 @@ def install(
         else config.get_default("show_aliases", config.env_bool("SHOW_ALIASES", False))
     )
 
+    emergency.prime()
+
+    global _coalescer, _loop_coalescer
+    _flush_coalescer()
+    _remove_loop_exception_handler()
+
+    writer = output.StderrWriter()
+    _coalescer = None
+    _loop_coalescer = None
+    if thread_coalesce_window > 0:
+        _coalescer = output.ThreadStormCoalescer(writer, thread_coalesce_window)
+        if asyncio_exception_handler:
+            _loop_coalescer = output.ThreadStormCoalescer(
+                writer, thread_coalesce_window, kind="tasks"
+            )
+
     excepthook = init_excepthook(
         color=color,
         local_stack_only=resolved_local_stack_only,
         exclude_patterns=resolved_exclude_patterns,
         show_aliases=resolved_show_aliases,
+        format_timeout=config.get_format_timeout(),
+        policies=policy_table,
+        writer=writer,
+        coalescer=_coalescer,
+        loop_coalescer=_loop_coalescer,
     )
     sys.excepthook = excepthook
 
@@ -149,8 +396,62 @@ def install(
 
     threading.excepthook = thread_excepthook
 
+    if asyncio_exception_handler:
+        _set_loop_exception_handler(init_loop_exception_handler(excepthook))
+
+
+def _flush_coalescer() -> None:
+    for coalescer in (_coalescer, _loop_coalescer):
+        if coalescer is not None:
+            coalescer.close()
+
+
+atexit.register(_flush_coalescer)
+
 
 def uninstall() -> None:
-    """Restore the default excepthook."""
+    """Restore the default excepthook and asyncio loop exception handler."""
+    global _coalescer, _loop_coalescer
+    _flush_coalescer()
+    _coalescer = None
+    _loop_coalescer = None
+    _remove_loop_exception_handler()
+
     sys.excepthook = sys.__excepthook__
     threading.excepthook = threading.__excepthook__
+
+
+def warmup(freeze: bool = False) -> None:
+    """Pay the one-time cost of the first formatted exception ahead of time.
+
+    Imports the formatting machinery, computes the alias tables, compiles the
+    configured exclude patterns and renders a throwaway traceback. Call it
+    before forking workers (e.g. gunicorn `--preload`) so they inherit the
+    warm state instead of each paying for it on their first failure.
+
+    With `freeze=True`, `gc.freeze()` moves everything allocated so far into
+    the permanent generation, so collections in the forked workers don't touch
+    (and copy) the inherited pages.
+    """
+    # imported for their side effect, the excepthook imports them lazily
+    from beautiful_traceback import deadline, formatting  # noqa: F401
+
+    emergency.prime()
+    exclude_patterns = config.get_default("exclude_patterns", ())
+
+    try:
+        raise RuntimeError("beautiful_traceback warmup")
+    except RuntimeError as exc:
+        # rendered directly, a warmup shouldn't show up in the formatting stats
+        formatting.exc_to_traceback_str(
+            exc,
+            formatting.get_tb_attr(exc),
+            color=True,
+            exclude_patterns=exclude_patterns,
+        )
+
+    if freeze:
+        import gc
+
+        gc.collect()
+        gc.freeze()
@@ -44,6 +44,28 @@ def _format_traceback_json(
     }
 
 
+def _traceback_ir_to_json(
+    tb: ExceptionTraceback,
+    local_stack_only: bool,
+    exclude_patterns: typ.Sequence[str],
+) -> dict[str, typ.Any]:
+    """Convert one IR traceback to a JSON-serializable traceback dict."""
+    entries = list(tb.stack_frames)
+    if not entries:
+        return {
+            "exception": tb.exc_name,
+            "message": tb.exc_msg,
+            "frames": [],
+        }
+
+    ctx = fmt._init_entries_context(
+        entries,
+        term_width=fmt.DEFAULT_COLUMNS,
+        exclude_patterns=exclude_patterns,
+    )
+    return _format_traceback_json(ctx.rows, tb.exc_name, tb.exc_msg, local_stack_only)
+
+
 def exc_to_json(
     exc_info: tuple[type[BaseException], BaseException, types.TracebackType | None]
     | BaseException,
@@ -103,53 +125,18 @@ def exc_to_json(
         return result
 
     main_tb, main_exc = tracebacks[0]
-    entries = list(main_tb.stack_frames)
-
-    if not entries:
-        result = {
-            "exception": main_tb.exc_name,
-            "message": main_tb.exc_msg,
-            "frames": [],
-        }
-    else:
-        ctx = fmt._init_entries_context(
-            entries,
-            term_width=fmt.DEFAULT_COLUMNS,
-            exclude_patterns=resolved_exclude_patterns,
-        )
-        result = _format_traceback_json(
-            ctx.rows,
-            main_tb.exc_name,
-            main_tb.exc_msg,
-            resolved_local_stack_only,
-        )
-
+    result = _traceback_ir_to_json(
+        main_tb, resolved_local_stack_only, resolved_exclude_patterns
+    )
     result.update(_exc_metadata(main_exc))
 
     if len(tracebacks) > 1:
         chain = []
         for tb, chain_exc in tracebacks[1:]:
-            entries = list(tb.stack_frames)
-            if not entries:
-                chain_item = {
-                    "exception": tb.exc_name,
-                    "message": tb.exc_msg,
-                    "relationship": "caused_by" if tb.is_caused else "context",
-                    "frames": [],
-                }
-            else:
-                ctx = fmt._init_entries_context(
-                    entries,
-                    term_width=fmt.DEFAULT_COLUMNS,
-                    exclude_patterns=resolved_exclude_patterns,
-                )
-                chain_item = _format_traceback_json(
-                    ctx.rows,
-                    tb.exc_name,
-                    tb.exc_msg,
-                    resolved_local_stack_only,
-                )
-                chain_item["relationship"] = "caused_by" if tb.is_caused else "context"
+            chain_item = _traceback_ir_to_json(
+                tb, resolved_local_stack_only, resolved_exclude_patterns
+            )
+            chain_item["relationship"] = "caused_by" if tb.is_caused else "context"
             chain_item.update(_exc_metadata(chain_exc))
             chain.append(chain_item)
 
@@ -164,6 +151,37 @@ def exc_to_json(
     return result
 
 
+def tracebacks_to_json(
+    tracebacks: list[ExceptionTraceback],
+    local_stack_only: bool = False,
+    exclude_patterns: typ.Sequence[str] = (),
+) -> dict[str, typ.Any]:
+    """Like `exc_to_json`, for the IR returned by `formatting.exc_to_tracebacks`.
+
+    The IR holds no exceptions, so "notes" and "syntax_error" are not included.
+    """
+    # the IR lists the outermost cause first, the JSON starts with the
+    # exception that was raised last
+    main_tb, *chained = reversed(tracebacks)
+    result = _traceback_ir_to_json(main_tb, local_stack_only, exclude_patterns)
+
+    if chained:
+        chain = []
+        previous = main_tb
+        for tb in chained:
+            chain_item = _traceback_ir_to_json(tb, local_stack_only, exclude_patterns)
+            # in the IR, an exception is flagged for having a cause (or context)
+            chain_item["relationship"] = (
+                "caused_by" if previous.is_caused else "context"
+            )
+            chain.append(chain_item)
+            previous = tb
+
+        result["chain"] = chain
+
+    return result
+
+
 def _exc_metadata(exc: BaseException) -> dict[str, typ.Any]:
     meta: dict[str, typ.Any] = {}
 
@@ -0,0 +1,155 @@
+"""Report where an asyncio event loop is blocked when it stops ticking.
+
+A timer on the loop records a heartbeat, and a daemon thread checks it. When
+the loop misses its heartbeat for longer than the threshold, the thread grabs
+the loop thread's frame from `sys._current_frames()` and renders its stack.
+A healthy loop only pays for one timer callback per half threshold.
+
+The first stall at a given stack is rendered in full, later ones only get a
+one-line reminder with a count.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+import types
+import typing as typ
+
+from beautiful_traceback import formatting as fmt
+from beautiful_traceback.stack_dump import Stack, format_stacks
+
+StackKey = tuple[tuple[types.CodeType, int], ...]
+
+
+class Stall(typ.NamedTuple):
+    """Stalls seen at one stack of the loop thread."""
+
+    occurrences: int
+    location: str
+
+
+class LoopStallWatchdog:
+    """Watches `loop` and reports stalls longer than `threshold` seconds."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        threshold: float = 0.1,
+        file: typ.TextIO | None = None,
+        **format_options: typ.Any,
+    ) -> None:
+        self.loop = loop
+        self.threshold = threshold
+        self.file = file
+        self.format_options = {"local_stack_only": True, **format_options}
+        self.stalls: dict[StackKey, Stall] = {}
+        self._last_beat = time.monotonic()
+        self._reported_beat: float | None = None
+        self._loop_thread: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.loop.call_soon_threadsafe(self._beat)
+        self._thread = threading.Thread(
+            target=self._run, name="beautiful-traceback-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _beat(self) -> None:
+        if self._stop.is_set():
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self.loop.call_later(self.threshold / 2, self._beat)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.threshold / 2):
+            if self.loop.is_closed():
+                break
+            if not self.loop.is_running():
+                # code run between loop runs doesn't stall it, and the
+                # heartbeat starts over once the loop runs again
+                self._last_beat = time.monotonic()
+                continue
+
+            last_beat = self._last_beat
+            if last_beat == self._reported_beat or self._loop_thread is None:
+                continue
+
+            blocked_for = time.monotonic() - last_beat
+            if blocked_for > self.threshold:
+                # once per stall
+                self._reported_beat = last_beat
+                self._report(blocked_for)
+
+    def _report(self, blocked_for: float) -> None:
+        assert self._loop_thread is not None
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+
+        key = tuple((f.f_code, lineno) for f, lineno in traceback.walk_stack(frame))
+        header = f"Event loop blocked for more than {blocked_for * 1000:.0f}ms"
+        stall = self.stalls.get(key)
+        if stall is not None:
+            occurrences = stall.occurrences + 1
+            self.stalls[key] = stall._replace(occurrences=occurrences)
+            self._write(
+                f"{header} at {stall.location} again ({occurrences} times)" + os.linesep
+            )
+            return
+
+        entries = fmt.stack_to_entries(frame)
+        innermost = entries[-1] if entries else None
+        location = (
+            f"{innermost.module}:{innermost.lineno} in {innermost.call}"
+            if innermost is not None
+            else "<unknown>"
+        )
+        self.stalls[key] = Stall(1, location)
+
+        out = self._out()
+        isatty = getattr(out, "isatty", lambda: False)()
+        options = {"color": isatty, **self.format_options}
+        text = format_stacks([Stack("Loop thread", entries)], **options)
+        self._write(f"{os.linesep}{header}:{os.linesep}{text}")
+
+    def _out(self) -> typ.TextIO:
+        return self.file if self.file is not None else sys.stderr
+
+    def _write(self, text: str) -> None:
+        out = self._out()
+        out.write(text)
+        out.flush()
+
+
+def install_loop_watchdog(
+    threshold: float = 0.1,
+    loop: asyncio.AbstractEventLoop | None = None,
+    file: typ.TextIO | None = None,
+    **format_options: typ.Any,
+) -> LoopStallWatchdog:
+    """Start reporting stalls of `loop` (default: the running loop).
+
+    Stacks of stalls longer than `threshold` seconds are written to `file`
+    (default: stderr) with `format_stacks()`, called with `format_options`.
+    Only local frames are shown unless `local_stack_only=False` is passed.
+    The watchdog stops by itself once the loop is closed, call `stop()` on
+    the returned watchdog to remove it earlier.
+    """
+    if loop is None:
+        loop = asyncio.get_running_loop()
+
+    watchdog = LoopStallWatchdog(loop, threshold, file, **format_options)
+    watchdog.start()
+    return watchdog
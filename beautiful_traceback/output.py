@@ -0,0 +1,187 @@
+"""Serialized stderr output and thread storm coalescing for the excepthook.
+
+When many worker threads die at once (e.g. a shared connection pool is
+closed), each thread would render the same stack in parallel and the writes
+would interleave. `StderrWriter` serializes writes, and
+`ThreadStormCoalescer` renders only the first of a burst of identical
+tracebacks. The rest are summarized once the window closes:
+
+    ... and 199 more threads with the same exception: [Worker-2, Worker-3, ...]
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import types
+    import typing as typ
+
+MAX_SUMMARY_NAMES = 20
+"Thread names listed in a coalesced summary before it is truncated."
+
+Fingerprint = tuple[object, ...]
+
+
+def fingerprint_exception(
+    exc_type: type[BaseException],
+    exc_value: BaseException,
+    traceback: types.TracebackType | None,
+) -> Fingerprint:
+    """Cheap identity of an exception and its stack, computed before rendering."""
+    try:
+        exc_msg = str(exc_value)
+    except Exception:
+        exc_msg = ""
+
+    locations: list[tuple[str, str, int | None]] = []
+    while traceback is not None:
+        code = traceback.tb_frame.f_code
+        locations.append((code.co_filename, code.co_name, traceback.tb_lineno))
+        traceback = traceback.tb_next
+
+    return (exc_type, exc_msg, tuple(locations))
+
+
+class StderrWriter:
+    """Write complete reports to `sys.stderr` under a lock.
+
+    A report written in several pieces, like the emergency path's, holds
+    `lock` for all of them so other threads can't write in between.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+
+    def write(self, text: str) -> None:
+        with self.lock:
+            # resolved on every write, sys.stderr may be swapped at runtime
+            sys.stderr.write(text)
+            sys.stderr.flush()
+
+
+class _Burst:
+    def __init__(self, started: float) -> None:
+        self.started = started
+        self.written = False
+        self.thread_names: list[str] = []
+
+
+def _format_summary(thread_names: list[str], kind: str = "threads") -> str:
+    names = ", ".join(thread_names[:MAX_SUMMARY_NAMES])
+    if len(thread_names) > MAX_SUMMARY_NAMES:
+        names += ", ..."
+
+    return (
+        f"... and {len(thread_names)} more {kind} with the same exception: [{names}]\n"
+    )
+
+
+class ThreadStormCoalescer:
+    """Render identical thread tracebacks arriving within `window` seconds once.
+
+    `kind` names the sources in summaries, e.g. "tasks" for asyncio tasks.
+    Summaries of closed windows are written by a single flusher thread,
+    started with the first burst.
+    """
+
+    def __init__(
+        self, writer: StderrWriter, window: float, kind: str = "threads"
+    ) -> None:
+        self._writer = writer
+        self._window = window
+        self._kind = kind
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._bursts: dict[Fingerprint, _Burst] = {}
+        self._flusher: threading.Thread | None = None
+        self._closed = False
+
+    def submit(
+        self,
+        fingerprint: Fingerprint,
+        thread_name: str,
+        render: typ.Callable[[], str],
+    ) -> None:
+        with self._lock:
+            now = time.monotonic()
+            burst = self._bursts.get(fingerprint)
+            if burst is not None and now - burst.started < self._window:
+                burst.thread_names.append(thread_name)
+                return
+
+            summary = ""
+            if burst is not None and burst.thread_names:
+                summary = _format_summary(burst.thread_names, self._kind)
+
+            burst = _Burst(now)
+            self._bursts[fingerprint] = burst
+            self._start_flusher()
+
+        # rendering happens outside the lock so distinct exceptions don't wait
+        text = render()
+        # the previous burst's summary and this traceback are one report
+        self._writer.write(summary + text)
+        with self._lock:
+            burst.written = True
+
+    def flush(self, force: bool = False) -> None:
+        """Emit summaries for closed windows, or for all bursts when forced."""
+        with self._lock:
+            self._flush_locked(force)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+            flusher = self._flusher
+            self._flusher = None
+
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join()
+
+        self.flush(force=True)
+
+    def _flush_locked(self, force: bool) -> None:
+        now = time.monotonic()
+        summaries: list[str] = []
+        for fingerprint, burst in list(self._bursts.items()):
+            is_closed = burst.written and now - burst.started >= self._window
+            if not (force or is_closed):
+                continue
+
+            del self._bursts[fingerprint]
+            if burst.thread_names:
+                summaries.append(_format_summary(burst.thread_names, self._kind))
+
+        if summaries:
+            self._writer.write("".join(summaries))
+
+    def _start_flusher(self) -> None:
+        if self._flusher is not None:
+            self._wakeup.notify()
+            return
+
+        self._flusher = threading.Thread(
+            target=self._run_flusher,
+            name="beautiful-traceback-flusher",
+            daemon=True,
+        )
+        self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        with self._lock:
+            while not self._closed:
+                self._flush_locked(force=False)
+                if not self._bursts:
+                    # idle until the next burst
+                    self._wakeup.wait()
+                    continue
+
+                # a burst still being rendered is checked again a window later
+                next_close = min(burst.started for burst in self._bursts.values())
+                delay = next_close + self._window - time.monotonic()
+                self._wakeup.wait(max(delay, self._window / 10))
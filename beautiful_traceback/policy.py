@@ -0,0 +1,110 @@
+"""Per-exception-type handling policies for the excepthook.
+
+Common terminations such as Ctrl-C or a closed pipe (`cli | head`) don't
+need the full alias/padding/color treatment. A policy table maps exception
+classes to one of these modes:
+
+- "full": the regular beautiful_traceback output.
+- "compact": the innermost frame and the exception line.
+- "message": only the exception line.
+- "silent": nothing at all.
+
+Lookups follow the MRO, so a policy for `OSError` also applies to
+`BrokenPipeError` unless that has its own entry, and resolved types are
+cached so repeated lookups are a single dict hit.
+"""
+
+from __future__ import annotations
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import types
+    import typing as typ
+
+    PolicyMode = typ.Literal["full", "compact", "message", "silent"]
+
+# NOTE: spelled out instead of derived from PolicyMode, this module is imported
+#   by install() and must not import typing at runtime
+POLICY_MODES: frozenset[str] = frozenset({"full", "compact", "message", "silent"})
+
+DEFAULT_POLICIES: dict[type[BaseException], PolicyMode] = {
+    KeyboardInterrupt: "compact",
+    BrokenPipeError: "silent",
+}
+"Policies applied by `install()` unless overridden."
+
+
+def _iter_subclasses(cls: type) -> typ.Iterable[type]:
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _iter_subclasses(subclass)
+
+
+class PolicyTable:
+    """MRO-aware mapping from exception classes to a handling mode."""
+
+    def __init__(self, policies: typ.Mapping[type[BaseException], PolicyMode]):
+        for exc_class, mode in policies.items():
+            if mode not in POLICY_MODES:
+                raise ValueError(
+                    f"invalid policy mode {mode!r} for {exc_class.__name__}, "
+                    f"expected one of {sorted(POLICY_MODES)}"
+                )
+
+        self._policies = dict(policies)
+        self._resolved: dict[type[BaseException], PolicyMode] = {}
+
+        # precompute the classes that exist today, new ones are cached on first use
+        for exc_class in self._policies:
+            self.resolve(exc_class)
+            for subclass in _iter_subclasses(exc_class):
+                self.resolve(subclass)
+
+    def resolve(self, exc_type: type[BaseException]) -> PolicyMode:
+        mode = self._resolved.get(exc_type)
+        if mode is not None:
+            return mode
+
+        mode = "full"
+        for cls in exc_type.__mro__:
+            if cls in self._policies:
+                mode = self._policies[cls]
+                break
+
+        self._resolved[exc_type] = mode
+        return mode
+
+
+def _exc_line(exc_type: type[BaseException], exc_value: BaseException) -> str:
+    try:
+        exc_msg = str(exc_value)
+    except Exception:
+        exc_msg = "<exception str() failed>"
+
+    if exc_msg:
+        return f"{exc_type.__name__}: {exc_msg}\n"
+    return f"{exc_type.__name__}\n"
+
+
+def format_message(
+    exc_type: type[BaseException],
+    exc_value: BaseException,
+    traceback: types.TracebackType | None,
+) -> str:
+    return _exc_line(exc_type, exc_value)
+
+
+def format_compact(
+    exc_type: type[BaseException],
+    exc_value: BaseException,
+    traceback: types.TracebackType | None,
+) -> str:
+    if traceback is None:
+        return _exc_line(exc_type, exc_value)
+
+    while traceback.tb_next is not None:
+        traceback = traceback.tb_next
+
+    code = traceback.tb_frame.f_code
+    location = f"    {code.co_filename}:{traceback.tb_lineno}  {code.co_name}\n"
+    return location + _exc_line(exc_type, exc_value)
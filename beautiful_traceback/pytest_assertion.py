@@ -1,10 +1,45 @@
 """Helpers for extracting pytest's rewritten assertion details."""
 
 import os
+import typing as typ
 
 import pytest
 
 
+class FailureDetails(typ.NamedTuple):
+    """What pytest knows about a failure beyond the exception itself."""
+
+    message_override: str | None
+    assertion_details: str | None
+
+
+# details of the most recent failure, keyed by the exception since pytest
+# creates several ExceptionInfo objects for it. Builtin exceptions can't be
+# weakly referenced, pytest keeps the last failure alive anyway (sys.last_exc).
+_last_details: tuple[BaseException, FailureDetails] | None = None
+
+
+def get_failure_details(
+    excinfo: pytest.ExceptionInfo, longrepr: object = None
+) -> FailureDetails:
+    """Return the message override and assertion details of a failure.
+
+    Computed once per exception. `longrepr` is the repr pytest already built
+    for the report, if any. When it has long style entries, the assertion
+    details are read from it instead of building another repr.
+    """
+    global _last_details
+
+    if _last_details is not None and _last_details[0] is excinfo.value:
+        return _last_details[1]
+
+    details = FailureDetails(
+        _message_override(excinfo), _assertion_details(excinfo, longrepr)
+    )
+    _last_details = (excinfo.value, details)
+    return details
+
+
 def get_exception_message_override(excinfo: pytest.ExceptionInfo) -> str | None:
     """Return pytest's verbose exception message when rewriting adds detail.
 
@@ -14,16 +49,28 @@ def get_exception_message_override(excinfo: pytest.ExceptionInfo) -> str | None:
     details. Pulling reprcrash.message preserves that verbose message when
     pytest provides one.
     """
+    return get_failure_details(excinfo).message_override
+
+
+def get_pytest_assertion_details(excinfo: pytest.ExceptionInfo) -> str | None:
+    """Return pytest's rewritten assertion lines for AssertionError.
+
+    Pytest only provides left/right diffs when a module is rewritten during
+    import. For helper modules, call pytest.register_assert_rewrite before
+    importing them, otherwise the assertion message is plain and there are no
+    diff lines to extract.
+    """
+    return get_failure_details(excinfo).assertion_details
+
+
+def _message_override(excinfo: pytest.ExceptionInfo) -> str | None:
     try:
-        repr_info = excinfo.getrepr(style="long")
+        # this is what pytest puts in reprcrash.message, without building
+        # the repr of the whole traceback
+        message = excinfo.exconly(tryshort=True)
     except Exception:
         return None
 
-    reprcrash = getattr(repr_info, "reprcrash", None)
-    if reprcrash is None:
-        return None
-
-    message = getattr(reprcrash, "message", None)
     if not message:
         return None
 
@@ -42,34 +89,45 @@ def get_exception_message_override(excinfo: pytest.ExceptionInfo) -> str | None:
     return message
 
 
-def get_pytest_assertion_details(excinfo: pytest.ExceptionInfo) -> str | None:
-    """Return pytest's rewritten assertion lines for AssertionError.
+def visible_entries(excinfo: pytest.ExceptionInfo) -> typ.Any:
+    """Traceback entries pytest shows, all of them if every entry is hidden."""
+    return excinfo.traceback.filter(excinfo) or excinfo.traceback
 
-    Pytest only provides left/right diffs when a module is rewritten during
-    import. For helper modules, call pytest.register_assert_rewrite before
-    importing them, otherwise the assertion message is plain and there are no
-    diff lines to extract.
-    """
-    if not isinstance(excinfo.value, AssertionError):
-        return None
 
-    try:
-        # pytest stores assertion diffs on its own repr object, not the exception.
-        # Reference: https://github.com/pytest-dev/pytest/blob/main/src/_pytest/_code/code.py
-        repr_info = excinfo.getrepr(style="long")
-    except Exception:
+def _last_visible_entry(excinfo: pytest.ExceptionInfo) -> typ.Any:
+    return visible_entries(excinfo)[-1:]
+
+
+def _long_reprentries(longrepr: object) -> list[typ.Any] | None:
+    reprtraceback = getattr(longrepr, "reprtraceback", None)
+    if getattr(reprtraceback, "style", None) != "long":
         return None
 
-    reprtraceback = getattr(repr_info, "reprtraceback", None)
-    if reprtraceback is None:
-        chain = getattr(repr_info, "chain", None)
-        if chain:
-            reprtraceback = chain[-1][0]
+    return getattr(reprtraceback, "reprentries", None)
+
 
-    if reprtraceback is None:
+def _assertion_details(
+    excinfo: pytest.ExceptionInfo, longrepr: object = None
+) -> str | None:
+    # pytest only adds assertion explanations to AssertionError entries
+    if not isinstance(excinfo.value, AssertionError):
         return None
 
-    reprentries = getattr(reprtraceback, "reprentries", None)
+    reprentries = _long_reprentries(longrepr)
+    if not reprentries:
+        try:
+            # pytest stores assertion diffs on its own repr object, not the
+            # exception. Only the last visible entry is needed, building the
+            # repr of every entry re-parses the source of each module.
+            # Reference: https://github.com/pytest-dev/pytest/blob/main/src/_pytest/_code/code.py
+            repr_info = excinfo.getrepr(
+                style="long", chain=False, tbfilter=_last_visible_entry
+            )
+        except Exception:
+            return None
+
+        reprentries = _long_reprentries(repr_info)
+
     if not reprentries:
         return None
 
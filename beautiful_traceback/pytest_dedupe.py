@@ -0,0 +1,58 @@
+"""Deduplication of identical failures in the pytest terminal summary.
+
+When a shared fixture or helper breaks, every test using it fails with the
+same traceback. The first failure is printed in full, later ones only refer
+to it, and the terminal summary lists the tests that share each traceback.
+"""
+
+import typing as typ
+
+if typ.TYPE_CHECKING:
+    from .pytest_longrepr import BeautifulLongRepr
+
+
+class FailureGroup(typ.NamedTuple):
+    """Tests failing with the same traceback, in the order they were reported."""
+
+    longrepr: "BeautifulLongRepr"
+    nodeids: list[str]
+
+
+class FailureDeduplicator:
+    """Plugin grouping failed test reports by their traceback fingerprint."""
+
+    def __init__(self) -> None:
+        self.groups: dict[tuple[typ.Any, ...], FailureGroup] = {}
+
+    def pytest_runtest_logreport(self, report: typ.Any) -> None:
+        if not report.failed:
+            return
+
+        from .pytest_longrepr import BeautifulLongRepr
+
+        longrepr = report.longrepr
+        if not isinstance(longrepr, BeautifulLongRepr):
+            return
+
+        fingerprint = longrepr.fingerprint()
+        group = self.groups.get(fingerprint)
+        if group is None:
+            self.groups[fingerprint] = FailureGroup(longrepr, [report.nodeid])
+            return
+
+        group.nodeids.append(report.nodeid)
+        longrepr.mark_duplicate_of(group.longrepr, group.nodeids[0])
+
+    def pytest_terminal_summary(self, terminalreporter: typ.Any) -> None:
+        shared = [group for group in self.groups.values() if len(group.nodeids) > 1]
+        if not shared:
+            return
+
+        terminalreporter.write_sep("=", "identical failures")
+        for group in shared:
+            first, *others = group.nodeids
+            terminalreporter.write_line(
+                f"{len(group.nodeids)} tests failed with the traceback of {first}:"
+            )
+            for nodeid in others:
+                terminalreporter.write_line(f"    {nodeid}")
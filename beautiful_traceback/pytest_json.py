@@ -0,0 +1,76 @@
+"""NDJSON report of pytest failures (`--beautiful-traceback-json=path`).
+
+One record per failure is appended to the file as soon as it's reported, so
+memory use doesn't grow with the number of failures. With xdist, only the
+controller writes, from the snapshots sent by the workers.
+"""
+
+import typing as typ
+
+if typ.TYPE_CHECKING:
+    from .pytest_longrepr import BeautifulLongRepr
+
+
+def failure_record(
+    nodeid: str, phase: str, longrepr: "BeautifulLongRepr"
+) -> dict[str, typ.Any]:
+    """An `exc_to_json` shaped record of a failure, with test metadata."""
+    import hashlib
+
+    from .json_formatting import tracebacks_to_json
+
+    fingerprint = hashlib.blake2b(
+        repr(longrepr.fingerprint()).encode(), digest_size=8
+    ).hexdigest()
+
+    record: dict[str, typ.Any] = {
+        "nodeid": nodeid,
+        "phase": phase,
+        "fingerprint": fingerprint,
+    }
+    record.update(
+        tracebacks_to_json(
+            longrepr.tracebacks,
+            local_stack_only=longrepr.local_stack_only,
+            exclude_patterns=longrepr.exclude_patterns,
+        )
+    )
+    record["assertion_details"] = longrepr.assertion_details
+    return record
+
+
+class JsonFailureReport:
+    """Plugin appending a JSON record per failed report to `path`."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file: typ.TextIO | None = None
+
+    def _write(self, nodeid: str, phase: str, report: typ.Any) -> None:
+        from .pytest_longrepr import BeautifulLongRepr
+
+        if not isinstance(report.longrepr, BeautifulLongRepr):
+            return
+
+        import json
+
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+
+        record = failure_record(nodeid, phase, report.longrepr)
+        self._file.write(json.dumps(record) + "\n")
+        # readers can follow the file while the session runs
+        self._file.flush()
+
+    def pytest_runtest_logreport(self, report: typ.Any) -> None:
+        if report.failed:
+            self._write(report.nodeid, report.when, report)
+
+    def pytest_collectreport(self, report: typ.Any) -> None:
+        if report.failed:
+            self._write(report.nodeid, "collect", report)
+
+    def pytest_unconfigure(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,198 @@
+"""Lazily rendered longrepr for pytest reports.
+
+Replacing `report.longrepr` with a rendered string pays for formatting every
+failure, even under `--tb=no` or `--tb=line`, for expected failures, or when
+the terminal reporter is disabled. `BeautifulLongRepr` keeps a snapshot of
+the failure (the IR and pytest's assertion details, no frames) and renders it
+when pytest actually prints it.
+
+With pytest-xdist, the snapshot is shipped to the controller as plain data
+(`to_json` / `from_json`) and rendered there, at the controller's terminal
+width.
+"""
+
+import os
+import typing as typ
+
+import pytest
+
+from . import formatting
+from .common import ExceptionTraceback, StackFrameEntry
+from .pytest_assertion import get_failure_details, visible_entries
+
+
+class CrashLocation(typ.NamedTuple):
+    """The `reprcrash` of a failure, used by `--tb=line` and the summary."""
+
+    path: str
+    lineno: int
+    message: str
+
+    def __str__(self) -> str:
+        # like pytest's ReprFileLocation, only the first line of the message
+        return f"{self.path}:{self.lineno}: {self.message.partition('\n')[0]}"
+
+    def toterminal(self, tw: typ.Any) -> None:
+        tw.write(self.path, bold=True, red=True)
+        tw.line(f":{self.lineno}: {self.message.partition('\n')[0]}")
+
+
+def _crash_location(excinfo: pytest.ExceptionInfo) -> CrashLocation | None:
+    entries = visible_entries(excinfo)
+    if not entries:
+        return None
+
+    entry = entries[-1]
+    return CrashLocation(
+        entry.frame.code.raw.co_filename,
+        entry.lineno + 1,
+        excinfo.exconly(tryshort=True),
+    )
+
+
+class BeautifulLongRepr:
+    """A failure's longrepr, rendered the first time pytest prints it."""
+
+    def __init__(
+        self,
+        tracebacks: list[ExceptionTraceback],
+        assertion_details: str | None,
+        reprcrash: CrashLocation | None,
+        local_stack_only: bool = False,
+        exclude_patterns: typ.Sequence[str] = (),
+        show_aliases: bool = True,
+        crash_line_only: bool = False,
+    ) -> None:
+        self.tracebacks = tracebacks
+        self.assertion_details = assertion_details
+        self.reprcrash = reprcrash
+        self.local_stack_only = local_stack_only
+        self.exclude_patterns = tuple(exclude_patterns)
+        self.show_aliases = show_aliases
+        # with `--tb=line`, pytest prints the crash line itself
+        self.crash_line_only = crash_line_only
+        self._rendered: dict[tuple[bool, int | None], str] = {}
+        # nodeid of an earlier test that failed with the same traceback
+        self.duplicate_of: str | None = None
+
+    @classmethod
+    def from_excinfo(
+        cls,
+        excinfo: pytest.ExceptionInfo,
+        local_stack_only: bool = False,
+        exclude_patterns: typ.Sequence[str] = (),
+        show_aliases: bool = True,
+        longrepr: object = None,
+        hide_framework_frames: bool = False,
+        crash_line_only: bool = False,
+    ) -> "BeautifulLongRepr":
+        """Snapshot a failure. `longrepr` is the repr pytest built, if any."""
+        message_override, assertion_details = get_failure_details(excinfo, longrepr)
+        return cls(
+            formatting.exc_to_tracebacks(
+                excinfo.value,
+                excinfo.tb,
+                message_override,
+                hide_framework_frames=hide_framework_frames,
+            ),
+            assertion_details,
+            _crash_location(excinfo),
+            local_stack_only=local_stack_only,
+            exclude_patterns=exclude_patterns,
+            show_aliases=show_aliases,
+            crash_line_only=crash_line_only,
+        )
+
+    def to_json(self) -> dict[str, typ.Any]:
+        """Plain data for pytest's report serialization, see `from_json`."""
+        # NamedTuples are converted to lists, execnet only serializes builtins
+        return {
+            "tracebacks": [
+                [
+                    tb.exc_name,
+                    tb.exc_msg,
+                    [list(frame) for frame in tb.stack_frames],
+                    tb.is_caused,
+                    tb.is_context,
+                ]
+                for tb in self.tracebacks
+            ],
+            "assertion_details": self.assertion_details,
+            "reprcrash": list(self.reprcrash) if self.reprcrash else None,
+            "local_stack_only": self.local_stack_only,
+            "exclude_patterns": list(self.exclude_patterns),
+            "show_aliases": self.show_aliases,
+            "crash_line_only": self.crash_line_only,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, typ.Any]) -> "BeautifulLongRepr":
+        tracebacks = [
+            ExceptionTraceback(
+                exc_name,
+                exc_msg,
+                [StackFrameEntry(*frame) for frame in stack_frames],
+                is_caused,
+                is_context,
+            )
+            for exc_name, exc_msg, stack_frames, is_caused, is_context in data[
+                "tracebacks"
+            ]
+        ]
+        reprcrash = data["reprcrash"]
+        return cls(
+            tracebacks,
+            data["assertion_details"],
+            CrashLocation(*reprcrash) if reprcrash else None,
+            local_stack_only=data["local_stack_only"],
+            exclude_patterns=data["exclude_patterns"],
+            show_aliases=data["show_aliases"],
+            crash_line_only=data["crash_line_only"],
+        )
+
+    def fingerprint(self) -> tuple[typ.Any, ...]:
+        """Equal for failures with identical tracebacks and assertion details."""
+        return (
+            tuple(
+                (tb.exc_name, tb.exc_msg, tuple(tb.stack_frames), tb.is_caused)
+                for tb in self.tracebacks
+            ),
+            self.assertion_details,
+        )
+
+    def mark_duplicate_of(self, other: "BeautifulLongRepr", nodeid: str) -> None:
+        """Print a reference to `nodeid` instead of this traceback."""
+        self.duplicate_of = nodeid
+        # the output is identical, it's rendered at most once for both
+        self._rendered = other._rendered
+
+    def render(self, color: bool = False, term_width: int | None = None) -> str:
+        key = (color, term_width)
+        text = self._rendered.get(key)
+        if text is None:
+            text = formatting.format_tracebacks(
+                self.tracebacks,
+                color,
+                self.local_stack_only,
+                exclude_patterns=self.exclude_patterns,
+                show_aliases=self.show_aliases,
+                term_width=term_width,
+            )
+            if self.assertion_details:
+                text += os.linesep + self.assertion_details + os.linesep
+            self._rendered[key] = text
+
+        return text
+
+    def toterminal(self, tw: typ.Any) -> None:
+        if self.crash_line_only:
+            return
+
+        if self.duplicate_of is not None:
+            tw.line(f"Same traceback as {self.duplicate_of}, see identical failures")
+            return
+
+        tw.line(self.render(color=tw.hasmarkup, term_width=tw.fullwidth))
+
+    def __str__(self) -> str:
+        return self.render()
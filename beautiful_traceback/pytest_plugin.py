@@ -5,9 +5,14 @@ modules registered via pytest.register_assert_rewrite). The rewritten asserts
 raise AssertionError instances that include rich explanation text and left/right
 diffs inside pytest's repr objects, not on the exception itself. This plugin
 extracts those repr details and appends them to beautiful_traceback output.
+
+This module is the `pytest11` entry point, so it's imported by every pytest
+run. It only registers options and hooks, the formatting machinery is
+imported when the first failure is reported.
 """
 
 import os
+import typing as typ
 from collections.abc import Generator
 
 import pytest
@@ -18,11 +23,18 @@ from pytest_plugin_utils.config import (
     set_pytest_option,
 )
 
-from . import config, formatting
-from .pytest_assertion import (
+from . import config
+from .pytest_assertion import (  # noqa: F401 - re-exported for compatibility
     get_exception_message_override,
+    get_failure_details,
     get_pytest_assertion_details,
 )
+from .pytest_dedupe import FailureDeduplicator
+from .pytest_json import JsonFailureReport
+from .pytest_watchdog import HangWatchdog
+
+if typ.TYPE_CHECKING:
+    from .pytest_longrepr import BeautifulLongRepr
 
 # __package__ is str | None (None when run as a top-level script), so we narrow it here
 assert __package__ is not None
@@ -60,6 +72,38 @@ set_pytest_option(
     available="all",
     help="Show the 'Aliases for entries in sys.path' section",
 )
+set_pytest_option(
+    _namespace,
+    "beautiful_traceback_hide_framework_frames",
+    default=None,
+    type_hint=bool,
+    available="all",
+    help="Hide pytest and pluggy frames, unless the error comes from them alone",
+)
+set_pytest_option(
+    _namespace,
+    "beautiful_traceback_json",
+    default=None,
+    type_hint=str,
+    available="all",
+    help="Append one JSON record per failure to this NDJSON file",
+)
+set_pytest_option(
+    _namespace,
+    "beautiful_traceback_timeout",
+    default=None,
+    type_hint=str,
+    available="all",
+    help="Dump the stacks of all threads when a test runs longer (seconds)",
+)
+set_pytest_option(
+    _namespace,
+    "beautiful_traceback_dedupe_failures",
+    default=None,
+    type_hint=bool,
+    available="all",
+    help="Print identical failures once and list the tests sharing them",
+)
 
 
 def _opt_bool(config_obj: Config, key: str, fallback: bool = False) -> bool:
@@ -78,11 +122,54 @@ def _opt_str_list(config_obj: Config, key: str, fallback: list[str]) -> list[str
     return fallback
 
 
-def _format_traceback(excinfo: pytest.ExceptionInfo, config_obj: Config) -> str:
-    """Format a traceback with beautiful_traceback styling and pytest details."""
-    message_override = get_exception_message_override(excinfo)
-    assertion_details = get_pytest_assertion_details(excinfo)
+def _opt_str(config_obj: Config, key: str) -> str | None:
+    val = get_pytest_option(_namespace, config_obj, key, type_hint=str)
+    if val:
+        assert isinstance(val, str)
+        return val
+    return None
+
+
+def _opt_timeout(config_obj: Config) -> float | None:
+    val = _opt_str(config_obj, "beautiful_traceback_timeout")
+    if val is None:
+        timeout = config.env_float("TEST_TIMEOUT", None)
+    else:
+        try:
+            timeout = float(val)
+        except ValueError:
+            raise pytest.UsageError(
+                f"beautiful_traceback_timeout must be a number of seconds, got {val!r}"
+            ) from None
+
+    if timeout is None or timeout <= 0:
+        return None
+    return timeout
 
+
+UNRENDERED_TB_STYLES = frozenset({"no", "line"})
+"`--tb` styles that never print a traceback, failures are only snapshotted for JSON."
+
+
+class PluginSettings(typ.NamedTuple):
+    """Plugin options, resolved once per session in `pytest_configure`."""
+
+    # whether failures are snapshotted at all
+    enabled: bool
+    tbstyle: str
+    json_path: str | None
+    local_stack_only: bool
+    exclude_patterns: tuple[str, ...]
+    show_aliases: bool
+    hide_framework_frames: bool
+    dedupe_failures: bool
+    timeout: float | None
+
+
+_settings_key = pytest.StashKey[PluginSettings]()
+
+
+def _resolve_settings(config_obj: Config) -> PluginSettings:
     local_stack_only_fallback = config.get_default(
         "local_stack_only", config.env_bool("LOCAL_STACK_ONLY", True)
     )
@@ -91,36 +178,165 @@ def _format_traceback(excinfo: pytest.ExceptionInfo, config_obj: Config) -> str:
         "show_aliases", config.env_bool("SHOW_ALIASES", True)
     )
 
-    formatted_traceback = formatting.exc_to_traceback_str(
-        excinfo.value,
-        excinfo.tb,
-        color=True,
+    tbstyle = str(config_obj.getoption("tbstyle", "auto") or "auto")
+    json_path = _opt_str(config_obj, "beautiful_traceback_json")
+    if json_path is not None:
+        # like --junitxml, relative to the invocation directory
+        json_path = os.path.abspath(os.path.expanduser(json_path))
+
+    return PluginSettings(
+        enabled=(
+            _opt_bool(config_obj, "enable_beautiful_traceback")
+            and (tbstyle not in UNRENDERED_TB_STYLES or json_path is not None)
+        ),
+        tbstyle=tbstyle,
+        json_path=json_path,
         local_stack_only=_opt_bool(
             config_obj,
             "enable_beautiful_traceback_local_stack_only",
             local_stack_only_fallback,
         ),
-        exc_msg_override=message_override,
-        exclude_patterns=_opt_str_list(
-            config_obj,
-            "beautiful_traceback_exclude_patterns",
-            exclude_patterns_fallback,
+        exclude_patterns=tuple(
+            _opt_str_list(
+                config_obj,
+                "beautiful_traceback_exclude_patterns",
+                exclude_patterns_fallback,
+            )
         ),
         show_aliases=_opt_bool(
             config_obj, "beautiful_traceback_show_aliases", show_aliases_fallback
         ),
+        hide_framework_frames=_opt_bool(
+            config_obj, "beautiful_traceback_hide_framework_frames", True
+        ),
+        dedupe_failures=_opt_bool(
+            config_obj, "beautiful_traceback_dedupe_failures", True
+        ),
+        timeout=_opt_timeout(config_obj),
+    )
+
+
+def _get_settings(config_obj: Config) -> PluginSettings:
+    """Return the settings resolved for this session."""
+    settings = config_obj.stash.get(_settings_key, None)
+    if settings is None:
+        # hooks can run before pytest_configure, e.g. for usage errors
+        settings = _resolve_settings(config_obj)
+        config_obj.stash[_settings_key] = settings
+    return settings
+
+
+def _snapshot_failure(
+    excinfo: pytest.ExceptionInfo, settings: PluginSettings, longrepr: object = None
+) -> "BeautifulLongRepr":
+    """Snapshot a failure, it is rendered when pytest prints the report."""
+    from .pytest_longrepr import BeautifulLongRepr
+
+    return BeautifulLongRepr.from_excinfo(
+        excinfo,
+        local_stack_only=settings.local_stack_only,
+        exclude_patterns=settings.exclude_patterns,
+        show_aliases=settings.show_aliases,
+        longrepr=longrepr,
+        hide_framework_frames=settings.hide_framework_frames,
+        crash_line_only=settings.tbstyle == "line",
     )
 
-    if assertion_details:
-        formatted_traceback += os.linesep + assertion_details + os.linesep
 
-    return formatted_traceback
+SERIALIZED_LONGREPR_KEY = "$beautiful_traceback"
+"Key of the snapshot in a serialized report's longrepr, e.g. sent by xdist workers."
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_report_to_serializable(report) -> Generator[None, None, None]:
+    """Serialize the failure snapshot instead of a rendered string.
+
+    pytest serializes unknown longreprs with `str()`, which would render every
+    failure on the xdist worker. The snapshot is sent as data and rendered by
+    the controller instead.
+    """
+    if not report.failed:
+        yield
+        return
+
+    from .pytest_longrepr import BeautifulLongRepr
+
+    longrepr = report.longrepr
+    if not isinstance(longrepr, BeautifulLongRepr):
+        yield
+        return
+
+    report.longrepr = None
+    try:
+        outcome = yield  # type: ignore[misc]
+    finally:
+        report.longrepr = longrepr
+
+    data = outcome.get_result()  # type: ignore[attr-defined]
+    if data is not None:
+        data["longrepr"] = {SERIALIZED_LONGREPR_KEY: longrepr.to_json()}
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_report_from_serializable(data) -> Generator[None, None, None]:
+    """Restore a failure snapshot serialized by `pytest_report_to_serializable`."""
+    longrepr = data.get("longrepr")
+    if not isinstance(longrepr, dict) or SERIALIZED_LONGREPR_KEY not in longrepr:
+        yield
+        return
+
+    # pytest's deserialization doesn't know the snapshot, it sees no longrepr
+    data["longrepr"] = None
+    try:
+        outcome = yield  # type: ignore[misc]
+    finally:
+        data["longrepr"] = longrepr
+
+    report = outcome.get_result()  # type: ignore[attr-defined]
+    if report is not None:
+        from .pytest_longrepr import BeautifulLongRepr
+
+        report.longrepr = BeautifulLongRepr.from_json(longrepr[SERIALIZED_LONGREPR_KEY])
 
 
 def pytest_addoption(parser) -> None:
     register_pytest_options(_namespace, parser)
 
 
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config: Config) -> None:
+    # trylast so `beautiful_traceback.configure()` calls made by conftest
+    # pytest_configure hooks are taken into account
+    settings = _resolve_settings(config)
+    config.stash[_settings_key] = settings
+
+    if settings.timeout is not None:
+        config.pluginmanager.register(
+            HangWatchdog(
+                settings.timeout,
+                local_stack_only=settings.local_stack_only,
+                exclude_patterns=settings.exclude_patterns,
+                show_aliases=settings.show_aliases,
+                hide_framework_frames=settings.hide_framework_frames,
+            ),
+            "beautiful_traceback_watchdog",
+        )
+
+    # xdist workers don't print or store reports, the controller does
+    if not settings.enabled or hasattr(config, "workerinput"):
+        return
+
+    if settings.dedupe_failures and settings.tbstyle not in UNRENDERED_TB_STYLES:
+        config.pluginmanager.register(
+            FailureDeduplicator(), "beautiful_traceback_dedupe"
+        )
+
+    if settings.json_path is not None:
+        config.pluginmanager.register(
+            JsonFailureReport(settings.json_path), "beautiful_traceback_json"
+        )
+
+
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call) -> Generator[None, None, None]:
     """Format test execution tracebacks with beautiful_traceback.
@@ -131,8 +347,13 @@ def pytest_runtest_makereport(item, call) -> Generator[None, None, None]:
     outcome = yield  # type: ignore[misc]
     report = outcome.get_result()  # type: ignore[attr-defined]
 
-    if _opt_bool(item.config, "enable_beautiful_traceback") and report.failed:
-        report.longrepr = _format_traceback(call.excinfo, item.config)
+    # passing reports are the vast majority, they must not cost anything
+    if not report.failed:
+        return
+
+    settings = _get_settings(item.config)
+    if settings.enabled:
+        report.longrepr = _snapshot_failure(call.excinfo, settings, report.longrepr)
 
 
 def pytest_exception_interact(node, call, report) -> None:
@@ -141,5 +362,15 @@ def pytest_exception_interact(node, call, report) -> None:
     This hook runs during collection (e.g., import errors, fixture errors)
     and ensures those errors also use beautiful_traceback formatting.
     """
-    if _opt_bool(node.config, "enable_beautiful_traceback") and report.failed:
-        report.longrepr = _format_traceback(call.excinfo, node.config)
+    if not report.failed or call.excinfo is None:
+        return
+
+    settings = _get_settings(node.config)
+    if not settings.enabled:
+        return
+
+    from .pytest_longrepr import BeautifulLongRepr
+
+    # test failures were already handled by pytest_runtest_makereport
+    if not isinstance(report.longrepr, BeautifulLongRepr):
+        report.longrepr = _snapshot_failure(call.excinfo, settings, report.longrepr)
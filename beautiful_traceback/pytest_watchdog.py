@@ -0,0 +1,100 @@
+"""Dump the stacks of all threads when a test runs past a timeout.
+
+A single daemon thread watches the running test. Starting and finishing a
+test only swaps an attribute, so the watchdog can stay on for a whole suite.
+The test isn't interrupted: the dump is written once per test, to the stderr
+pytest started with, so it shows up even while output is captured.
+"""
+
+import faulthandler
+import os
+import threading
+import time
+import typing as typ
+from collections.abc import Generator
+
+import pytest
+
+
+class HangWatchdog:
+    """Plugin dumping all thread stacks of tests running over `timeout` seconds."""
+
+    def __init__(self, timeout: float, **format_options: typ.Any) -> None:
+        self.timeout = timeout
+        self.format_options = format_options
+        # (nodeid, deadline) of the running test
+        self._current: tuple[str, float] | None = None
+        self._dumped: tuple[str, float] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._fd: int | None = None
+
+        # imported upfront, a hung test could be holding the import lock
+        from . import stack_dump
+
+        self._stack_dump = stack_dump
+
+    def start(self) -> None:
+        # capturing replaces fd 2 while tests run, keep the real stderr
+        self._fd = os.dup(2)
+        self._thread = threading.Thread(
+            target=self._run, name="beautiful-traceback-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            current = self._current
+            if current is None or current is self._dumped:
+                self._stop.wait(self.timeout)
+                continue
+
+            remaining = current[1] - time.monotonic()
+            if remaining > 0:
+                self._stop.wait(remaining)
+                continue
+
+            # only if the same test is still running
+            if current is self._current:
+                self._dumped = current
+                self._dump(current[0])
+
+    def _dump(self, nodeid: str) -> None:
+        assert self._fd is not None
+        header = f"{nodeid} is still running after {self.timeout:g}s"
+        try:
+            stacks = self._stack_dump.format_thread_stacks(
+                color=os.isatty(self._fd),
+                exclude_threads={threading.get_ident()},
+                **self.format_options,
+            )
+        except Exception:
+            os.write(self._fd, f"\n{header}:\n".encode())
+            faulthandler.dump_traceback(self._fd, all_threads=True)
+            return
+
+        text = f"{os.linesep}{header}, stacks of all threads:{os.linesep}{stacks}"
+        os.write(self._fd, text.encode(errors="replace"))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item) -> Generator[None, None, None]:
+        self._current = (item.nodeid, time.monotonic() + self.timeout)
+        try:
+            yield
+        finally:
+            self._current = None
+
+    def pytest_sessionstart(self) -> None:
+        self.start()
+
+    def pytest_unconfigure(self) -> None:
+        self.stop()
@@ -0,0 +1,234 @@
+"""Render the live stacks of all threads with the traceback formatter.
+
+Used to find out where a hung process (or test) is stuck. The stacks get the
+same path aliases, `local_stack_only` and `exclude_patterns` filtering as
+tracebacks, with a single aliases section shared by all threads. Threads with
+identical stacks, like the idle workers of a pool, are rendered once.
+"""
+
+import contextlib
+import faulthandler
+import os
+import signal
+import sys
+import threading
+import traceback
+import types
+import typing as typ
+
+from beautiful_traceback import config
+from beautiful_traceback import formatting as fmt
+from beautiful_traceback.common import ALIASES_HEAD, StackFrameEntryList
+
+
+class Stack(typ.NamedTuple):
+    """A titled live stack, outermost call first."""
+
+    title: str
+    entries: StackFrameEntryList
+
+
+MAX_GROUP_NAMES = 3
+"""Number of thread names listed in the title of a group of threads."""
+
+
+def _thread_title(ident: int, thread: threading.Thread | None) -> str:
+    if thread is None:
+        return f"Thread {ident:#x}"
+
+    daemon = " (daemon)" if thread.daemon else ""
+    return f'Thread "{thread.name}"{daemon}'
+
+
+def _group_title(threads: list[tuple[int, threading.Thread | None]], call: str) -> str:
+    names = sorted(
+        f'"{thread.name}"' if thread is not None else f"{ident:#x}"
+        for ident, thread in threads
+    )
+    more = len(names) - MAX_GROUP_NAMES
+    names = names[:MAX_GROUP_NAMES]
+    listed = ", ".join(names) + (f" and {more} more" if more > 0 else "")
+    return f"×{len(threads)} threads in {call}: {listed}"
+
+
+def _stack_key(frame: types.FrameType) -> tuple[tuple[types.CodeType, int], ...]:
+    return tuple((f.f_code, lineno) for f, lineno in traceback.walk_stack(frame))
+
+
+def thread_stacks(
+    frames: dict[int, types.FrameType] | None = None,
+    exclude_threads: typ.Container[int] = (),
+    hide_framework_frames: bool = False,
+    group: bool = True,
+) -> list[Stack]:
+    """The stacks of `frames` (default: all threads), by thread ident.
+
+    With `group`, threads stopped at the same lines share one stack, which
+    is only extracted once.
+    """
+    if frames is None:
+        frames = sys._current_frames()
+
+    threads = {thread.ident: thread for thread in threading.enumerate()}
+    groups: dict[typ.Hashable, list[tuple[int, types.FrameType]]] = {}
+    for ident, frame in frames.items():
+        if ident in exclude_threads:
+            continue
+        key = _stack_key(frame) if group else ident
+        groups.setdefault(key, []).append((ident, frame))
+
+    stacks = []
+    for members in groups.values():
+        ident, frame = members[0]
+        entries = fmt.stack_to_entries(frame, hide_framework_frames)
+        if len(members) == 1:
+            title = _thread_title(ident, threads.get(ident))
+        else:
+            call = entries[-1].call if entries else "?"
+            title = _group_title(
+                [(ident, threads.get(ident)) for ident, _ in members], call
+            )
+        stacks.append(Stack(title, entries))
+    return stacks
+
+
+def format_stacks(
+    stacks: list[Stack],
+    color: bool = False,
+    local_stack_only: bool | None = None,
+    exclude_patterns: typ.Sequence[str] | None = None,
+    show_aliases: bool | None = None,
+    term_width: int | None = None,
+) -> str:
+    """Render `stacks` one after the other, with shared aliases.
+
+    Stacks left without frames by `local_stack_only` or `exclude_patterns`
+    are only counted in a last line. Options left as None use the defaults
+    set with `configure()`.
+    """
+    resolved_local_stack_only: bool = (
+        local_stack_only
+        if local_stack_only is not None
+        else config.get_default("local_stack_only", False)
+    )
+    resolved_exclude_patterns: typ.Sequence[str] = (
+        exclude_patterns
+        if exclude_patterns is not None
+        else config.get_default("exclude_patterns", ())
+    )
+    resolved_show_aliases: bool = (
+        show_aliases
+        if show_aliases is not None
+        else config.get_default("show_aliases", True)
+    )
+
+    # one context for all stacks, so aliases and columns are shared
+    all_entries = [entry for stack in stacks for entry in stack.entries]
+    ctx = fmt._init_entries_context(all_entries, term_width=term_width)
+    compiled_exclude_patterns = fmt._compile_exclude_patterns(resolved_exclude_patterns)
+
+    lines = []
+    if ctx.aliases and not ctx.is_wide_mode and resolved_show_aliases:
+        lines.append(ALIASES_HEAD)
+        lines.extend(fmt._aliases_to_lines(ctx, color))
+
+    # rows are created one per entry, in order
+    rows = iter(ctx.rows)
+    hidden = 0
+    for stack in stacks:
+        stack_rows = [next(rows) for _ in stack.entries]
+        if compiled_exclude_patterns:
+            stack_rows = [
+                row
+                for row in stack_rows
+                if not fmt._row_matches_exclude_patterns(row, compiled_exclude_patterns)
+            ]
+
+        padded_rows = list(fmt._padded_rows(ctx._replace(rows=stack_rows)))
+        stack_lines = list(
+            fmt._rows_to_lines(padded_rows, color, resolved_local_stack_only)
+        )
+        # e.g. idle library threads, a header alone is just noise
+        if stack.entries and not stack_lines:
+            hidden += 1
+            continue
+
+        lines.append(f"{stack.title} (most recent call last):")
+        lines.extend(stack_lines)
+
+    if hidden:
+        plural = "s" if hidden > 1 else ""
+        lines.append(f"{hidden} stack{plural} with only library or excluded frames")
+
+    return os.linesep.join(lines) + os.linesep
+
+
+def format_thread_stacks(
+    color: bool = False,
+    local_stack_only: bool | None = None,
+    exclude_patterns: typ.Sequence[str] | None = None,
+    show_aliases: bool | None = None,
+    hide_framework_frames: bool = False,
+    exclude_threads: typ.Container[int] = (),
+    term_width: int | None = None,
+    frames: dict[int, types.FrameType] | None = None,
+    group: bool = True,
+) -> str:
+    """Render the current stack of every thread.
+
+    Options left as None use the defaults set with `configure()`.
+    `exclude_threads` are thread idents to leave out, e.g. the one of a
+    watchdog calling this.
+    """
+    return format_stacks(
+        thread_stacks(
+            frames,
+            exclude_threads=exclude_threads,
+            hide_framework_frames=hide_framework_frames,
+            group=group,
+        ),
+        color,
+        local_stack_only=local_stack_only,
+        exclude_patterns=exclude_patterns,
+        show_aliases=show_aliases,
+        term_width=term_width,
+    )
+
+
+def install_stack_dump(
+    signum: int,
+    file: typ.TextIO | None = None,
+    **format_options: typ.Any,
+) -> typ.Any:
+    """Dump the stacks of all threads whenever the process receives `signum`.
+
+    The dump is written to `file` (default: `sys.stderr` at the time of the
+    signal) by `format_thread_stacks()`, called with `format_options`. If
+    rendering fails, `faulthandler` writes its raw dump instead. Returns the
+    previous handler of `signum`.
+    """
+
+    def handle(received: int, frame: types.FrameType | None) -> None:
+        out = file if file is not None else sys.stderr
+        frames = sys._current_frames()
+        if frame is not None:
+            # start the main thread's stack where the signal interrupted it
+            frames[threading.get_ident()] = frame
+
+        header = f"Stacks of all threads on {signal.Signals(received).name}"
+        try:
+            isatty = getattr(out, "isatty", lambda: False)()
+            options = {"color": isatty, **format_options}
+            text = format_thread_stacks(frames=frames, **options)
+        except Exception:
+            out.write(f"{os.linesep}{header}:{os.linesep}")
+            out.flush()
+            # a handler must not raise into the interrupted code
+            with contextlib.suppress(Exception):
+                faulthandler.dump_traceback(out, all_threads=True)
+            return
+
+        out.write(f"{os.linesep}{header}:{os.linesep}{text}")
+        out.flush()
+
+    return signal.signal(signum, handle)
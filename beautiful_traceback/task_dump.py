@@ -0,0 +1,229 @@
+"""Render the await stacks of asyncio tasks with the traceback formatter.
+
+Answers "what are my tasks waiting on?". Tasks suspended at the same lines
+are rendered once with a count. Stacks are extracted in chunks, yielding to
+the event loop in between, and rendered in a worker thread, so a dump of many
+tasks doesn't stall it.
+"""
+
+import asyncio
+import contextlib
+import os
+import sys
+import types
+import typing as typ
+
+from beautiful_traceback import formatting as fmt
+from beautiful_traceback import frame_filter
+from beautiful_traceback.stack_dump import MAX_GROUP_NAMES, Stack, format_stacks
+
+DEFAULT_CHUNK_SIZE = 500
+"""Number of tasks whose stacks are extracted between yields to the loop."""
+
+
+def _task_title(task: asyncio.Task) -> str:
+    coro = task.get_coro()
+    name = getattr(coro, "__qualname__", None) or type(coro).__name__
+    return f'Task "{task.get_name()}" running {name}'
+
+
+def _group_title(tasks: list[asyncio.Task], call: str) -> str:
+    names = sorted(f'"{task.get_name()}"' for task in tasks)
+    more = len(names) - MAX_GROUP_NAMES
+    listed = ", ".join(names[:MAX_GROUP_NAMES])
+    if more > 0:
+        listed += f" and {more} more"
+    return f"×{len(tasks)} tasks in {call}: {listed}"
+
+
+def _await_chain(task: asyncio.Task) -> list[types.FrameType]:
+    # Task.get_stack() stops at the task's own coroutine, follow what it awaits
+    frames = []
+    awaitable: typ.Any = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(
+            awaitable, "gi_frame", None
+        )
+        if frame is None:
+            break
+        frames.append(frame)
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(
+            awaitable, "gi_yieldfrom", None
+        )
+    return frames or task.get_stack()
+
+
+def _stack_key(frames: list[types.FrameType]) -> tuple[tuple[types.CodeType, int], ...]:
+    return tuple((frame.f_code, frame.f_lineno) for frame in frames)
+
+
+class _TaskGroup(typ.NamedTuple):
+    tasks: list[asyncio.Task]
+    stack: Stack
+    origin: Stack | None
+
+
+class _TaskGrouper:
+    """Accumulates tasks by await stack, extracting each distinct stack once.
+
+    Tasks with a recorded origin are followed by a "Task created at" stack,
+    and only grouped with tasks created at the same place.
+    """
+
+    def __init__(self, hide_framework_frames: bool, group: bool) -> None:
+        self.hide_framework_frames = hide_framework_frames
+        self.group = group
+        self.groups: dict[typ.Hashable, _TaskGroup] = {}
+        # only loaded once install_task_origins() was used
+        self.task_origins = sys.modules.get("beautiful_traceback.task_origins")
+
+    def add(self, task: asyncio.Task) -> None:
+        if task.done():
+            return
+
+        frames = _await_chain(task)
+        if not self.group:
+            key: typ.Hashable = id(task)
+        elif self.task_origins is not None:
+            key = (_stack_key(frames), self.task_origins._origins.get(task))
+        else:
+            key = _stack_key(frames)
+
+        existing = self.groups.get(key)
+        if existing is not None:
+            existing.tasks.append(task)
+            return
+
+        walked = [(frame, frame.f_lineno) for frame in frames]
+        entries = fmt._frames_to_entries(
+            frame_filter.visible_frames(walked, self.hide_framework_frames)
+        )
+        origin = None
+        if self.task_origins is not None:
+            origin_entries = self.task_origins.task_origin_entries(task)
+            if origin_entries is not None:
+                origin = Stack(self.task_origins.ORIGIN_TITLE, origin_entries)
+        self.groups[key] = _TaskGroup([task], Stack(_task_title(task), entries), origin)
+
+    def stacks(self) -> list[Stack]:
+        stacks = []
+        for tasks, stack, origin in self.groups.values():
+            if len(tasks) > 1:
+                call = stack.entries[-1].call if stack.entries else "?"
+                stack = stack._replace(title=_group_title(tasks, call))
+            stacks.append(stack)
+            if origin is not None:
+                stacks.append(origin)
+        return stacks
+
+
+def task_stacks(
+    tasks: typ.Iterable[asyncio.Task] | None = None,
+    hide_framework_frames: bool = False,
+    group: bool = True,
+) -> list[Stack]:
+    """The await stacks of `tasks` (default: all tasks of the running loop).
+
+    With `group`, tasks suspended at the same lines share one stack. This
+    runs in one go; use `format_task_stacks()` from the loop for many tasks.
+    """
+    if tasks is None:
+        tasks = asyncio.all_tasks()
+
+    grouper = _TaskGrouper(hide_framework_frames, group)
+    for task in tasks:
+        grouper.add(task)
+    return grouper.stacks()
+
+
+async def format_task_stacks(
+    color: bool = False,
+    local_stack_only: bool | None = None,
+    exclude_patterns: typ.Sequence[str] | None = None,
+    show_aliases: bool | None = None,
+    hide_framework_frames: bool = False,
+    term_width: int | None = None,
+    group: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> str:
+    """Render the await stack of every task of the running loop but this one.
+
+    Stacks are extracted `chunk_size` tasks at a time, yielding to the loop
+    in between, so tasks progressing meanwhile are shown where they were
+    when their chunk came up. The extracted stacks hold no frames and are
+    rendered with `asyncio.to_thread()`. Options left as None use the
+    defaults set with `configure()`.
+    """
+    current = asyncio.current_task()
+    tasks = [task for task in asyncio.all_tasks() if task is not current]
+
+    grouper = _TaskGrouper(hide_framework_frames, group)
+    for start in range(0, len(tasks), chunk_size):
+        if start:
+            await asyncio.sleep(0)
+        for task in tasks[start : start + chunk_size]:
+            grouper.add(task)
+
+    return await asyncio.to_thread(
+        format_stacks,
+        grouper.stacks(),
+        color,
+        local_stack_only=local_stack_only,
+        exclude_patterns=exclude_patterns,
+        show_aliases=show_aliases,
+        term_width=term_width,
+    )
+
+
+async def dump_task_stacks(
+    file: typ.TextIO | None = None, **format_options: typ.Any
+) -> None:
+    """Write `format_task_stacks(**format_options)` to `file` (default: stderr)."""
+    out = file if file is not None else sys.stderr
+    isatty = getattr(out, "isatty", lambda: False)()
+    text = await format_task_stacks(**{"color": isatty, **format_options})
+    out.write(f"{os.linesep}Stacks of all tasks:{os.linesep}{text}")
+    out.flush()
+
+
+def install_task_dump(
+    signum: int,
+    loop: asyncio.AbstractEventLoop | None = None,
+    file: typ.TextIO | None = None,
+    **format_options: typ.Any,
+) -> None:
+    """Dump the stacks of all tasks of `loop` whenever `signum` is received.
+
+    `loop` defaults to the running loop. The dump runs as a task on the loop,
+    see `format_task_stacks()` for `format_options`. Unix only, like
+    `loop.add_signal_handler()`.
+    """
+    if loop is None:
+        loop = asyncio.get_running_loop()
+
+    # the loop only keeps weak references to tasks
+    running: set[asyncio.Task] = set()
+
+    def dump() -> None:
+        task = loop.create_task(dump_task_stacks(file, **format_options))
+        running.add(task)
+        task.add_done_callback(finish)
+
+    def finish(task: asyncio.Task) -> None:
+        running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            out = file if file is not None else sys.stderr
+            with contextlib.suppress(Exception):
+                out.write(f"task dump failed: {task.exception()!r}{os.linesep}")
+                out.flush()
+
+    loop.add_signal_handler(signum, dump)
+
+
+def uninstall_task_dump(
+    signum: int, loop: asyncio.AbstractEventLoop | None = None
+) -> None:
+    """Remove the handler of `install_task_dump()` for `signum`."""
+    if loop is None:
+        loop = asyncio.get_running_loop()
+    loop.remove_signal_handler(signum)
@@ -0,0 +1,179 @@
+"""Remember where asyncio tasks were created.
+
+A task's traceback starts at its coroutine, the code that spawned it is lost.
+The task factory installed by `install_task_origins()` records the creator's
+frames, up to the event loop, followed by the recorded origin of the task that
+created it. Only code objects and bytecode offsets are kept, up to `depth`
+frames and for a `sample_rate` fraction of tasks. Line numbers and source are
+only looked up when a failing task is rendered, in a "Task created at"
+section.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import types
+import typing as typ
+import weakref
+
+if typ.TYPE_CHECKING:
+    from beautiful_traceback.common import StackFrameEntryList
+
+DEFAULT_DEPTH = 8
+"""Number of creator frames recorded per task."""
+
+ORIGIN_TITLE = "Task created at"
+"""Title of the rendered origin of a task."""
+
+# flat (code, f_lasti, code, f_lasti, ...) pairs, innermost frame first
+_Origin = tuple[typ.Any, ...]
+
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__) + os.sep
+
+_origins: "weakref.WeakKeyDictionary[asyncio.Future, _Origin]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# co_filename -> whether it belongs to asyncio, bounded by the source files
+_asyncio_files: dict[str, bool] = {}
+
+
+def _is_asyncio_file(filename: str) -> bool:
+    verdict = _asyncio_files[filename] = filename.startswith(_ASYNCIO_DIR)
+    return verdict
+
+
+def _record_origin(
+    frame: types.FrameType | None, parent: asyncio.Future | None, depth: int
+) -> _Origin:
+    # NOTE: This runs for every task. Frames are checked against a dict of
+    #   filenames, and f_lineno isn't used since it scans the line table of
+    #   the code object. The bytecode offset is resolved when rendering.
+    asyncio_files = _asyncio_files
+    origin: list[typ.Any] = []
+    limit = depth * 2
+    while frame is not None and len(origin) < limit:
+        code = frame.f_code
+        filename = code.co_filename
+        in_asyncio = asyncio_files.get(filename)
+        if in_asyncio is None:
+            in_asyncio = _is_asyncio_file(filename)
+
+        if in_asyncio:
+            # loop.create_task() and asyncio.create_task() before the
+            # creator, the event loop after it
+            if origin:
+                break
+        else:
+            origin += (code, frame.f_lasti)
+        frame = frame.f_back
+
+    # past the loop, continue with where the creating task came from
+    parent_origin = _origins.get(parent) if parent is not None else None
+    if parent_origin and len(origin) < limit:
+        origin += parent_origin[: limit - len(origin)]
+    return tuple(origin)
+
+
+def _lasti_to_lineno(code: types.CodeType, lasti: int) -> int:
+    for start, end, lineno in code.co_lines():
+        if start <= lasti < end and lineno is not None:
+            return lineno
+    return code.co_firstlineno
+
+
+def init_task_factory(
+    depth: int = DEFAULT_DEPTH,
+    sample_rate: float = 1.0,
+    task_factory: typ.Callable | None = None,
+) -> typ.Callable:
+    """A task factory recording origins, creating tasks with `task_factory`."""
+
+    def origin_task_factory(
+        loop: asyncio.AbstractEventLoop, coro: typ.Any, **kwargs: typ.Any
+    ) -> asyncio.Future:
+        if task_factory is not None:
+            task = task_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+
+        if sample_rate >= 1.0 or random.random() < sample_rate:
+            origin = _record_origin(sys._getframe(1), asyncio.current_task(loop), depth)
+            if origin:
+                _origins[task] = origin
+        return task
+
+    return origin_task_factory
+
+
+def install_task_origins(
+    loop: asyncio.AbstractEventLoop | None = None,
+    depth: int = DEFAULT_DEPTH,
+    sample_rate: float = 1.0,
+) -> None:
+    """Record where tasks of `loop` (default: the running loop) are created.
+
+    Wraps the loop's current task factory, if any. Record only a
+    `sample_rate` fraction of tasks to lower the overhead further.
+    """
+    if loop is None:
+        loop = asyncio.get_running_loop()
+
+    loop.set_task_factory(
+        init_task_factory(depth, sample_rate, loop.get_task_factory())
+    )
+
+
+def task_origin(task: asyncio.Future) -> list[tuple[types.CodeType, int]] | None:
+    """Where `task` was created as (code, line number) pairs, innermost first.
+
+    None if the task's origin wasn't recorded.
+    """
+    origin = _origins.get(task)
+    if not origin:
+        return None
+
+    return [
+        (code, _lasti_to_lineno(code, lasti))
+        for code, lasti in zip(origin[::2], origin[1::2], strict=True)
+    ]
+
+
+def task_origin_entries(task: asyncio.Future) -> "StackFrameEntryList | None":
+    """Where `task` was created as stack frame entries, outermost call first.
+
+    None if the task's origin wasn't recorded.
+    """
+    origin = task_origin(task)
+    if origin is None:
+        return None
+
+    import linecache
+
+    from beautiful_traceback.common import StackFrameEntry
+
+    entries = []
+    for code, lineno in reversed(origin):
+        context = linecache.getline(code.co_filename, lineno).strip()
+        entries.append(
+            StackFrameEntry(code.co_filename, code.co_name, str(lineno), context)
+        )
+    return entries
+
+
+def format_task_origin(
+    task: asyncio.Future, color: bool = False, **options: typ.Any
+) -> str:
+    """Render the "Task created at" section of `task`, or "" if not recorded.
+
+    `options` are passed on to `stack_dump.format_stacks()`.
+    """
+    entries = task_origin_entries(task)
+    if entries is None:
+        return ""
+
+    from beautiful_traceback.stack_dump import Stack, format_stacks
+
+    return format_stacks([Stack(ORIGIN_TITLE, entries)], color, **options)
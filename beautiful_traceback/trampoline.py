@@ -0,0 +1,155 @@
+"""Deferred excepthook installation for the .pth startup script.
+
+`install_deferred()` only puts small trampolines in place of `sys.excepthook`
+and `threading.excepthook`. The first exception reaching one of them runs the
+real `install()` and is then handed to the hook it installed, so processes
+that never crash don't pay for TTY probing, configuration or imports.
+
+`threading` isn't imported here. If it isn't loaded yet, a meta path finder
+puts the thread trampoline in place right after its first import.
+"""
+
+from __future__ import annotations
+
+import sys
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import types
+    import typing as typ
+
+_install_kwargs: dict[str, typ.Any] = {}
+_previous_sys_hook: typ.Callable | None = None
+_previous_thread_hook: typ.Callable | None = None
+
+
+def _activate() -> None:
+    remove()
+    try:
+        from beautiful_traceback import hook
+
+        hook.install(**_install_kwargs)
+    except Exception:
+        # the previous hooks are back in place, they report the exception
+        pass
+
+
+def _sys_trampoline(
+    exc_type: type[BaseException],
+    exc_value: BaseException,
+    traceback: types.TracebackType | None,
+) -> None:
+    previous = _previous_sys_hook or sys.__excepthook__
+    wrapper = sys.excepthook
+    _activate()
+    # NOTE: A wrapper installed over the trampoline (sentry-sdk chains to the
+    #   hook it found) is still in place if install() declined to replace it.
+    #   Going back through it would land here again, so only the hook set by
+    #   install() or the one the trampoline replaced is called.
+    hook = sys.excepthook
+    if hook is wrapper:
+        hook = previous
+    hook(exc_type, exc_value, traceback)
+
+
+def _thread_trampoline(args: typ.Any) -> None:
+    threading = sys.modules["threading"]
+    previous = _previous_thread_hook or threading.__excepthook__
+    wrapper = threading.excepthook
+    _activate()
+    hook = threading.excepthook
+    if hook is wrapper:
+        hook = previous
+    hook(args)
+
+
+def _hook_threading(threading: typ.Any) -> None:
+    global _previous_thread_hook
+
+    if threading.excepthook is not _thread_trampoline:
+        _previous_thread_hook = threading.excepthook
+        threading.excepthook = _thread_trampoline
+
+
+class _ThreadingLoader:
+    def __init__(self, loader: typ.Any) -> None:
+        self._loader = loader
+
+    def create_module(self, spec: typ.Any) -> types.ModuleType | None:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: types.ModuleType) -> None:
+        # hand the module back to the real loader before running it
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._loader.exec_module(module)
+        if _ThreadingFinder in sys.meta_path:
+            sys.meta_path.remove(_ThreadingFinder)
+            _hook_threading(module)
+
+
+class _ThreadingFinder:
+    """Wrap the loader of `threading` to hook it once it is imported."""
+
+    @classmethod
+    def find_spec(
+        cls,
+        fullname: str,
+        path: typ.Any = None,
+        target: types.ModuleType | None = None,
+    ) -> typ.Any:
+        if fullname != "threading":
+            return None
+
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is cls or find_spec is None:
+                continue
+
+            spec = find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            if hasattr(spec.loader, "exec_module"):
+                spec.loader = _ThreadingLoader(spec.loader)
+            return spec
+
+        return None
+
+
+def install_deferred(**install_kwargs: typ.Any) -> None:
+    """Install trampolines that run `install(**install_kwargs)` on first use.
+
+    An explicit `install()` call made before the first exception replaces the
+    trampolines.
+    """
+    global _install_kwargs, _previous_sys_hook
+
+    _install_kwargs = install_kwargs
+    if sys.excepthook is not _sys_trampoline:
+        _previous_sys_hook = sys.excepthook
+        sys.excepthook = _sys_trampoline
+
+    threading = sys.modules.get("threading")
+    if threading is not None:
+        _hook_threading(threading)
+    elif _ThreadingFinder not in sys.meta_path:
+        sys.meta_path.insert(0, _ThreadingFinder)
+
+
+def remove() -> None:
+    """Restore the hooks replaced by `install_deferred()`, if still in place."""
+    global _previous_sys_hook, _previous_thread_hook
+
+    if _ThreadingFinder in sys.meta_path:
+        sys.meta_path.remove(_ThreadingFinder)
+
+    if sys.excepthook is _sys_trampoline:
+        sys.excepthook = _previous_sys_hook or sys.__excepthook__
+    _previous_sys_hook = None
+
+    threading: typ.Any = sys.modules.get("threading")
+    if threading is not None and threading.excepthook is _thread_trampoline:
+        threading.excepthook = _previous_thread_hook or threading.__excepthook__
+    _previous_thread_hook = None
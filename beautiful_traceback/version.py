@@ -1,11 +1,15 @@
-"""Version handling for beautiful-traceback."""
+"""Version handling for beautiful-traceback.
 
-import importlib.metadata
-from pathlib import Path
+`__version__` is resolved on first access and cached. Looking up the installed
+version scans the metadata of every distribution on sys.path, which is too
+slow to do on import.
+"""
 
 
 def is_local_source_checkout() -> bool:
     """Check if the code is running from a local source checkout."""
+    from pathlib import Path
+
     package_dir = Path(__file__).resolve().parent
     # Since this is a flat layout (module-root = ""), repo root is the parent of the package dir
     repo_root = package_dir.parent
@@ -15,6 +19,8 @@ def is_local_source_checkout() -> bool:
 
 def get_version() -> str:
     """Get the version string, appending .dev if running from source."""
+    import importlib.metadata
+
     try:
         # Try to get the version of the installed package
         version = importlib.metadata.version("beautiful-traceback")
@@ -31,4 +37,12 @@ def get_version() -> str:
     return f"{version}.dev"
 
 
-__version__ = get_version()
+def __getattr__(name: str) -> str:
+    global __version__
+
+    if name != "__version__":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # cached as a module global, so later lookups skip __getattr__
+    __version__ = get_version()
+    return __version__
@@ -7,7 +7,7 @@
 #     "beautiful_traceback"
 # ]
 # ///
-"""FastAPI demo showing exc_to_json for JSON logging.
+"""FastAPI demo showing the ASGI middleware and exc_to_json for JSON logging.
 
 Note: This demo requires beautiful-traceback to be installed locally.
 Run from the project root with the project installed:
@@ -35,30 +35,25 @@ from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 
 from beautiful_traceback import exc_to_json
+from beautiful_traceback.asgi import BeautifulTracebackMiddleware
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(message)s",
 )
-log = logging.getLogger(__name__)
-
 app = FastAPI(title="Beautiful Traceback JSON Demo")
 
+# logs unhandled exceptions, rendered off the event loop, with the JSON form
+# attached to the log record as `traceback`
+app.add_middleware(BeautifulTracebackMiddleware, local_stack_only=False, json=True)
+
 
 @app.exception_handler(Exception)
 async def exception_handler(request, exc):
-    """Global exception handler that logs exceptions as JSON."""
-    exc_info = sys.exc_info()
-    json_traceback = exc_to_json(exc_info, local_stack_only=False)
-
-    log.error("unhandled exception", extra={"traceback": json_traceback})
-
+    """Global exception handler, the middleware already logged the traceback."""
     return JSONResponse(
         status_code=500,
-        content={
-            "error": "Internal server error",
-            "traceback": json_traceback,
-        },
+        content={"error": "Internal server error"},
     )
 
 
@@ -0,0 +1,66 @@
+"""Helpers for the opt-in benchmark tests.
+
+Benchmarks are skipped unless `BEAUTIFUL_TRACEBACK_BENCHMARKS=1` is set
+(`just benchmark`). Each run appends one JSON line per suite to
+`tmp/benchmarks/<suite>.jsonl`, so trends are visible across releases.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+RESULTS_DIR = Path(
+    os.environ.get(
+        "BEAUTIFUL_TRACEBACK_BENCHMARK_DIR", REPO_ROOT / "tmp" / "benchmarks"
+    )
+)
+
+ENABLED = os.environ.get("BEAUTIFUL_TRACEBACK_BENCHMARKS", "") == "1"
+
+requires_benchmarks = pytest.mark.skipif(
+    not ENABLED, reason="set BEAUTIFUL_TRACEBACK_BENCHMARKS=1 to run benchmarks"
+)
+
+
+def median_ms(samples: list[float]) -> float:
+    """Median of `samples` (in seconds), in milliseconds."""
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def time_process(
+    args: list[str], repeat: int, cwd: Path | None = None, check: bool = True
+) -> list[float]:
+    """Wall time of running `args` to completion, `repeat` times."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, check=check, capture_output=True, cwd=cwd)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def record(suite: str, results: dict[str, float]) -> Path:
+    """Append `results` with some run metadata to the suite's results file."""
+    from beautiful_traceback import version
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"{suite}.jsonl"
+    entry = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "version": version.get_version(),
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "results": results,
+    }
+    with path.open("a") as f:
+        f.write(json.dumps(entry) + "\n")
+    return path
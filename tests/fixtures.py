@@ -1,3 +1,4 @@
+from beautiful_traceback import formatting
 from beautiful_traceback.common import ExceptionTraceback, StackFrameEntry
 
 BASIC_TRACEBACK_STR = """
@@ -346,3 +347,38 @@ ALL_TRACEBACK_STRS = [
     COMPRESSABLE_TRACEBACK_STR,
     CHAINED_TRACEBACK_STR,
 ]
+
+
+def count_renders(monkeypatch) -> list[bool]:
+    """Record the `color` argument of every `format_tracebacks()` call."""
+    calls = []
+    original = formatting.format_tracebacks
+
+    def counting_format_tracebacks(tracebacks, color=False, *args, **kwargs):
+        calls.append(color)
+        return original(tracebacks, color, *args, **kwargs)
+
+    monkeypatch.setattr(formatting, "format_tracebacks", counting_format_tracebacks)
+    return calls
+
+
+FAILING_TEST = """
+def test_fails():
+    raise ValueError("rendered lazily")
+"""
+
+
+BROKEN_FIXTURE_TESTS = """
+import pytest
+
+@pytest.fixture
+def broken():
+    raise RuntimeError("fixture is broken")
+
+@pytest.mark.parametrize("value", range(4))
+def test_uses_fixture(broken, value):
+    pass
+
+def test_other():
+    raise ValueError("distinct failure")
+"""
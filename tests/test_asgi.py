@@ -0,0 +1,119 @@
+"""Tests for the ASGI middleware rendering exceptions off the event loop."""
+
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from beautiful_traceback import formatting
+from beautiful_traceback.asgi import BeautifulTracebackMiddleware
+
+HTTP_SCOPE = {"type": "http", "method": "GET", "path": "/orders"}
+
+
+def _load_order():
+    raise KeyError("order-42")
+
+
+async def _failing_app(scope, receive, send):
+    _load_order()
+
+
+async def _ok_app(scope, receive, send):
+    pass
+
+
+def _call(middleware, scope=HTTP_SCOPE):
+    async def main():
+        await middleware(scope, None, None)
+
+    try:
+        asyncio.run(main())
+    finally:
+        middleware.close()
+
+
+def test_exception_rendered_off_the_loop(caplog):
+    middleware = BeautifulTracebackMiddleware(
+        _failing_app, local_stack_only=False, json=True
+    )
+
+    with caplog.at_level(logging.ERROR, logger="beautiful_traceback.asgi"):
+        with pytest.raises(KeyError):
+            _call(middleware)
+
+    (record,) = caplog.records
+    assert record.thread != threading.main_thread().ident
+    message = record.getMessage()
+    assert message.startswith("Exception in ASGI application (GET /orders)")
+    assert 'raise KeyError("order-42")' in message
+    assert message.endswith("KeyError: 'order-42'")
+    assert record.traceback["exception"] == "KeyError"
+    assert record.traceback["frames"][-1]["function"] == "_load_order"
+
+
+def test_successful_requests_untouched(caplog):
+    middleware = BeautifulTracebackMiddleware(_ok_app)
+
+    with caplog.at_level(logging.ERROR, logger="beautiful_traceback.asgi"):
+        _call(middleware)
+        _call(middleware, {"type": "lifespan"})
+
+    assert caplog.records == []
+
+
+def test_burst_beyond_max_pending_only_logs_message(caplog):
+    middleware = BeautifulTracebackMiddleware(_failing_app, max_pending=1)
+
+    async def main():
+        results = await asyncio.gather(
+            *[middleware(HTTP_SCOPE, None, None) for _ in range(3)],
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, KeyError) for result in results)
+
+    with caplog.at_level(logging.ERROR, logger="beautiful_traceback.asgi"):
+        try:
+            asyncio.run(main())
+        finally:
+            middleware.close()
+
+    messages = sorted(record.getMessage() for record in caplog.records)
+    skipped = (
+        "Exception in ASGI application (GET /orders), 1 tracebacks pending: "
+        "KeyError: 'order-42'"
+    )
+    assert len(messages) == 3
+    assert messages[0].startswith("Exception in ASGI application (GET /orders)\n")
+    assert messages[1:] == [skipped, skipped]
+
+
+def test_app_exception_reraised_after_close(caplog):
+    middleware = BeautifulTracebackMiddleware(_failing_app)
+    middleware.close()
+
+    with caplog.at_level(logging.ERROR, logger="beautiful_traceback.asgi"):
+        with pytest.raises(KeyError, match="order-42"):
+            _call(middleware)
+
+    (record,) = caplog.records
+    assert record.getMessage() == (
+        "Exception in ASGI application (GET /orders), reporting it failed"
+    )
+    assert record.exc_info is not None
+    assert record.exc_info[0] is RuntimeError
+    assert middleware.pending == 0
+
+
+def test_snapshot_without_source_is_loaded_later():
+    try:
+        _load_order()
+    except KeyError as exc:
+        snapshot = formatting.exc_to_tracebacks(
+            exc, exc.__traceback__, with_source=False
+        )
+        full = formatting.exc_to_tracebacks(exc, exc.__traceback__)
+
+    assert [entry.src_ctx for entry in snapshot[0].stack_frames] == ["", ""]
+    assert formatting.load_sources(snapshot) == full
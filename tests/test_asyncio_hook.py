@@ -0,0 +1,124 @@
+"""Tests for the asyncio loop exception handler set by install()."""
+
+import asyncio
+import gc
+import io
+import logging
+import sys
+
+import beautiful_traceback
+
+
+def _run_captured(main, **install_options):
+    beautiful_traceback.install(
+        only_tty=False, color=False, asyncio_exception_handler=True, **install_options
+    )
+
+    captured_output = io.StringIO()
+    original_stderr = sys.stderr
+
+    try:
+        sys.stderr = captured_output
+        asyncio.run(main(), loop_factory=beautiful_traceback.new_event_loop)
+        # uninstall flushes pending summaries
+        beautiful_traceback.uninstall()
+    finally:
+        sys.stderr = original_stderr
+        beautiful_traceback.uninstall()
+
+    return captured_output.getvalue()
+
+
+def _fail_callback():
+    raise ConnectionError("upstream dropped")
+
+
+async def _fail_task(message):
+    raise ValueError(message)
+
+
+def test_callback_errors_rendered_and_coalesced():
+    """Test that a burst of identical callback errors is rendered once."""
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for _ in range(20):
+            loop.call_soon(_fail_callback)
+        await asyncio.sleep(0)
+
+    output = _run_captured(main, thread_coalesce_window=30)
+
+    assert output.count("Exception in callback _fail_callback()") == 1
+    assert output.count("ConnectionError: upstream dropped") == 1
+    assert "_fail_callback" in output
+    assert "... and 19 more tasks with the same exception: [<Handle" in output
+
+
+def test_never_retrieved_task_exception():
+    """Test that an unretrieved task exception goes through the formatter."""
+
+    async def main():
+        task = asyncio.create_task(_fail_task("lost"), name="Lost-Task")
+        await asyncio.sleep(0)
+        assert task.done()
+        del task
+        gc.collect()
+
+    output = _run_captured(main)
+
+    assert "Task exception was never retrieved:" in output
+    assert "ValueError: lost" in output
+    assert "_fail_task" in output
+
+
+def test_context_without_exception_uses_default_handler(caplog):
+    """Test that contexts without an exception keep the default handling."""
+
+    async def main():
+        asyncio.get_running_loop().call_exception_handler({"message": "just a note"})
+
+    with caplog.at_level(logging.ERROR, logger="asyncio"):
+        output = _run_captured(main)
+
+    assert output == ""
+    assert "just a note" in caplog.text
+
+
+def test_handler_set_on_running_loop():
+    """Test that install() inside a running loop sets the handler on it."""
+
+    async def main():
+        beautiful_traceback.install(only_tty=False, asyncio_exception_handler=True)
+        return asyncio.get_running_loop().get_exception_handler()
+
+    try:
+        assert asyncio.run(main()) is not None
+    finally:
+        beautiful_traceback.uninstall()
+
+
+def test_uninstall_removes_loop_exception_handler():
+    """Test that uninstall() restores every loop that received the handler."""
+    beautiful_traceback.install(only_tty=False, asyncio_exception_handler=True)
+    loops = [beautiful_traceback.new_event_loop() for _ in range(2)]
+    assert all(loop.get_exception_handler() is not None for loop in loops)
+
+    beautiful_traceback.uninstall()
+    assert [loop.get_exception_handler() for loop in loops] == [None, None]
+    for loop in loops:
+        loop.close()
+
+    loop = beautiful_traceback.new_event_loop()
+    assert loop.get_exception_handler() is None
+    loop.close()
+
+
+def test_event_loop_policy_left_alone():
+    """Test that install() doesn't touch the deprecated event loop policy."""
+    beautiful_traceback.install(only_tty=False, asyncio_exception_handler=True)
+    try:
+        loop = asyncio.new_event_loop()
+        assert loop.get_exception_handler() is None
+        loop.close()
+    finally:
+        beautiful_traceback.uninstall()
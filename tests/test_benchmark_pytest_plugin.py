@@ -0,0 +1,100 @@
+"""Per-test overhead of the pytest plugin, for passing and failing tests.
+
+Passing tests are measured in-process by driving the report hookwrapper the
+way pluggy does, since their overhead is far below the noise of a full
+pytest run. Failing tests are measured by running a suite with and without
+the plugin and dividing the difference of the median wall times.
+"""
+
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from beautiful_traceback import pytest_plugin
+
+from tests.benchmark import median_ms, record, requires_benchmarks, time_process
+
+pytestmark = requires_benchmarks
+
+REPEAT = 3
+
+PASSING_CALLS = 200_000
+FAILING_TESTS = 50
+
+PASSING_BUDGET_US = 5.0
+"Plugin overhead per passing report, in microseconds."
+
+FAILING_BUDGET_MS = 15.0
+"Plugin overhead per failing test (rendering included), in milliseconds."
+
+FAILING_SUITE = f"""
+import pytest
+
+def helper(value):
+    raise ValueError(f"failure {{value}}")
+
+@pytest.mark.parametrize("value", range({FAILING_TESTS}))
+def test_fails(value):
+    helper(value)
+"""
+
+
+@pytest.fixture(scope="module")
+def results():
+    results: dict[str, float] = {}
+    yield results
+    if results:
+        record("pytest_plugin", results)
+
+
+def test_passing_report_overhead(pytestconfig, results):
+    item = SimpleNamespace(config=pytestconfig)
+    outcome = SimpleNamespace(get_result=lambda: SimpleNamespace(failed=False))
+    hookwrapper = pytest_plugin.pytest_runtest_makereport
+
+    start = time.perf_counter()
+    for _ in range(PASSING_CALLS):
+        gen = hookwrapper(item, None)
+        next(gen)
+        try:
+            gen.send(outcome)
+        except StopIteration:
+            pass
+    elapsed = time.perf_counter() - start
+
+    overhead_us = elapsed * 1e6 / PASSING_CALLS
+    results["passing_overhead_us_per_report"] = round(overhead_us, 3)
+    assert overhead_us < PASSING_BUDGET_US
+
+
+def _suite_ms(path: Path, *plugin_args: str) -> float:
+    args = [
+        sys.executable,
+        "-m",
+        "pytest",
+        "-q",
+        "-p",
+        "no:cacheprovider",
+        *plugin_args,
+        str(path),
+    ]
+    # failing suites exit with 1, so return codes aren't checked
+    time_process(args, repeat=1, cwd=path.parent, check=False)
+    return median_ms(time_process(args, REPEAT, cwd=path.parent, check=False))
+
+
+def test_failing_test_overhead(tmp_path, results):
+    # an empty ini keeps the repository's addopts (coverage) out of the runs
+    (tmp_path / "pytest.ini").write_text("[pytest]\n")
+    path = tmp_path / "test_suite.py"
+    path.write_text(FAILING_SUITE)
+
+    with_plugin = _suite_ms(path)
+    without_plugin = _suite_ms(path, "-p", "no:beautiful_traceback")
+
+    overhead_ms = (with_plugin - without_plugin) / FAILING_TESTS
+    results["failing_overhead_ms_per_test"] = round(overhead_ms, 3)
+    assert overhead_ms < FAILING_BUDGET_MS
@@ -0,0 +1,144 @@
+"""Startup cost benchmarks: package import, install() and the .pth injection.
+
+Every measurement runs in a fresh interpreter of an isolated virtualenv that
+only sees this checkout, so installed plugins don't skew the numbers.
+"""
+
+import subprocess
+import sys
+import venv
+from pathlib import Path
+
+import pytest
+
+from beautiful_traceback import cli
+
+from tests.benchmark import (
+    REPO_ROOT,
+    median_ms,
+    record,
+    requires_benchmarks,
+    time_process,
+)
+
+pytestmark = requires_benchmarks
+
+REPEAT = 15
+
+IMPORT_BUDGET_MS = 5.0
+"Cumulative `-X importtime` of `import beautiful_traceback`."
+
+INSTALL_BUDGET_MS = 50.0
+"`import beautiful_traceback` plus `install()`, measured in-process."
+
+PTH_OVERHEAD_BUDGET_MS = 10.0
+"Extra interpreter startup time caused by the injected .pth file."
+
+
+def _create_venv(path: Path) -> tuple[Path, Path]:
+    venv.create(path, symlinks=sys.platform != "win32")
+    python = path / ("Scripts/python.exe" if sys.platform == "win32" else "bin/python")
+    site_packages = subprocess.run(
+        [python, "-c", "import sysconfig; print(sysconfig.get_path('purelib'))"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+    # make this checkout importable, nothing else is installed in the venv
+    (Path(site_packages) / "beautiful_traceback_checkout.pth").write_text(
+        f"{REPO_ROOT}\n"
+    )
+    return python, Path(site_packages)
+
+
+@pytest.fixture(scope="module")
+def plain_python(tmp_path_factory) -> Path:
+    python, _ = _create_venv(tmp_path_factory.mktemp("plain-venv"))
+    return python
+
+
+@pytest.fixture(scope="module")
+def injected_python(tmp_path_factory) -> Path:
+    python, site_packages = _create_venv(tmp_path_factory.mktemp("injected-venv"))
+    cli._create_injection_files(
+        site_packages / "_beautiful_traceback_injection.py",
+        site_packages / "beautiful_traceback_injection.pth",
+    )
+    return python
+
+
+@pytest.fixture(scope="module")
+def results():
+    results: dict[str, float] = {}
+    yield results
+    if results:
+        record("startup", results)
+
+
+def _cumulative_import_us(importtime_output: str, module: str) -> int:
+    for line in importtime_output.splitlines():
+        _, _, fields = line.partition("import time:")
+        parts = fields.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+
+    raise AssertionError(f"{module} missing from -X importtime output")
+
+
+def test_import_time(plain_python, results):
+    samples = []
+    for _ in range(REPEAT):
+        proc = subprocess.run(
+            [plain_python, "-X", "importtime", "-c", "import beautiful_traceback"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        samples.append(_cumulative_import_us(proc.stderr, "beautiful_traceback") / 1e6)
+
+    results["import_ms"] = median_ms(samples)
+    assert results["import_ms"] < IMPORT_BUDGET_MS
+
+
+def test_install_latency(plain_python, results):
+    script = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import beautiful_traceback\n"
+        "beautiful_traceback.install(only_tty=False)\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    samples = []
+    for _ in range(REPEAT):
+        proc = subprocess.run(
+            [plain_python, "-c", script], check=True, capture_output=True, text=True
+        )
+        samples.append(float(proc.stdout))
+
+    results["install_ms"] = median_ms(samples)
+    assert results["install_ms"] < INSTALL_BUDGET_MS
+
+
+def test_pth_injection_overhead(plain_python, injected_python, results):
+    # warm up the bytecode caches of both environments
+    time_process([plain_python, "-c", "pass"], repeat=2)
+    time_process([injected_python, "-c", "pass"], repeat=2)
+
+    baseline = median_ms(time_process([plain_python, "-c", "pass"], REPEAT))
+    injected = median_ms(time_process([injected_python, "-c", "pass"], REPEAT))
+
+    results["startup_baseline_ms"] = baseline
+    results["startup_injected_ms"] = injected
+    results["pth_overhead_ms"] = round(injected - baseline, 3)
+    assert results["pth_overhead_ms"] < PTH_OVERHEAD_BUDGET_MS
+
+
+def test_injection_is_active(injected_python):
+    """Guards the overhead benchmark against measuring a broken injection."""
+    script = (
+        "import sys\n"
+        "from beautiful_traceback import trampoline\n"
+        "assert sys.excepthook is trampoline._sys_trampoline\n"
+    )
+    subprocess.run([injected_python, "-c", script], check=True)
@@ -0,0 +1,68 @@
+"""Overhead of recording task origins, measured by creating 1M tasks."""
+
+import asyncio
+import time
+
+import pytest
+
+from beautiful_traceback import task_origins
+
+from tests.benchmark import record, requires_benchmarks
+
+pytestmark = requires_benchmarks
+
+TASKS = 1_000_000
+
+BATCH = 10_000
+"Tasks created before waiting for them, bounds the memory held at once."
+
+REPEAT = 3
+
+OVERHEAD_BUDGET = 0.6
+"Relative slowdown of creating and running tasks with every origin recorded."
+
+SAMPLED_OVERHEAD_BUDGET = 0.15
+"Relative slowdown with 1% of the origins recorded."
+
+SAMPLE_RATES = {"baseline": None, "origins": 1.0, "sampled_origins": 0.01}
+
+
+async def _noop() -> None:
+    pass
+
+
+async def _create_tasks(sample_rate: float | None) -> float:
+    if sample_rate is not None:
+        task_origins.install_task_origins(sample_rate=sample_rate)
+
+    start = time.perf_counter()
+    for _ in range(TASKS // BATCH):
+        await asyncio.gather(*[asyncio.create_task(_noop()) for _ in range(BATCH)])
+    return time.perf_counter() - start
+
+
+@pytest.fixture(scope="module")
+def results():
+    # interleaved, so a noisy neighbour doesn't only slow down one variant
+    samples: dict[str, list[float]] = {name: [] for name in SAMPLE_RATES}
+    for _ in range(REPEAT):
+        for name, sample_rate in SAMPLE_RATES.items():
+            samples[name].append(asyncio.run(_create_tasks(sample_rate)))
+
+    results = {f"tasks_1m_{name}_s": round(min(samples[name]), 3) for name in samples}
+    yield results
+    record("task_origins", results)
+
+
+def _overhead(results: dict[str, float], name: str) -> float:
+    overhead = results[f"tasks_1m_{name}_s"] / results["tasks_1m_baseline_s"] - 1
+    results[f"{name}_overhead"] = round(overhead, 3)
+    return overhead
+
+
+def test_task_origins_overhead(results):
+    assert _overhead(results, "origins") < OVERHEAD_BUDGET
+
+
+def test_sampled_task_origins_overhead(results):
+    assert _overhead(results, "sampled_origins") < SAMPLED_OVERHEAD_BUDGET
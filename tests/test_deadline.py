@@ -0,0 +1,163 @@
+"""Tests for the formatting time budget and stdlib fallback."""
+
+import io
+import logging
+
+import pytest
+
+import beautiful_traceback
+import beautiful_traceback.config as bt_config
+from beautiful_traceback import deadline, hook
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    deadline.reset_formatting_stats()
+    yield
+    bt_config._config.clear()
+    deadline.reset_formatting_stats()
+
+
+def _raise_value_error():
+    raise ValueError("budget test")
+
+
+def _capture() -> ValueError:
+    try:
+        _raise_value_error()
+    except ValueError as exc:
+        return exc
+    raise AssertionError("unreachable")
+
+
+def test_render_with_fallback_returns_render_result():
+    exc = _capture()
+
+    result = deadline.render_with_fallback(
+        lambda: "rendered", exc, exc.__traceback__, timeout=1.0
+    )
+
+    assert result == "rendered"
+    assert deadline.get_formatting_stats()["formatted"] == 1
+
+
+def test_expired_budget_falls_back_to_stdlib():
+    exc = _capture()
+
+    def render() -> str:
+        deadline.check()
+        return "rendered"
+
+    result = deadline.render_with_fallback(render, exc, exc.__traceback__, timeout=0)
+
+    assert result.startswith("Traceback (most recent call last):")
+    assert "_raise_value_error" in result
+    assert result.endswith("ValueError: budget test")
+    assert deadline.get_formatting_stats()["timeout_fallbacks"] == 1
+
+
+def test_render_error_falls_back_to_stdlib():
+    exc = _capture()
+
+    def render() -> str:
+        raise RuntimeError("formatter bug")
+
+    result = deadline.render_with_fallback(render, exc, exc.__traceback__, None)
+
+    assert "ValueError: budget test" in result
+    assert "formatter bug" not in result
+    assert deadline.get_formatting_stats()["error_fallbacks"] == 1
+
+
+def test_stdlib_failure_falls_back_to_one_line():
+    class UnprintableError(Exception):
+        def __str__(self) -> str:
+            raise RuntimeError("no str")
+
+    def render() -> str:
+        raise RuntimeError("formatter bug")
+
+    # a bogus traceback object makes traceback.format_exception raise
+    result = deadline.render_with_fallback(
+        render,
+        UnprintableError(),
+        "not a traceback",  # type: ignore[arg-type]
+        None,
+    )
+
+    assert result == "UnprintableError: <exception str() failed>"
+    stats = deadline.get_formatting_stats()
+    assert stats["error_fallbacks"] == 1
+    assert stats["minimal_fallbacks"] == 1
+
+
+def test_nested_budget_never_extends_outer_budget():
+    exc = _capture()
+
+    def inner() -> str:
+        deadline.check()
+        return "inner"
+
+    def outer() -> str:
+        return deadline.render_with_fallback(inner, exc, exc.__traceback__, 60)
+
+    result = deadline.render_with_fallback(outer, exc, exc.__traceback__, 0)
+
+    assert result.endswith("ValueError: budget test")
+    assert deadline.get_formatting_stats()["timeout_fallbacks"] == 1
+
+
+def test_check_is_noop_without_budget():
+    deadline.check()
+
+
+def test_excepthook_falls_back_when_budget_exceeded(capsys):
+    excepthook = hook.init_excepthook(
+        color=False,
+        local_stack_only=False,
+        exclude_patterns=(),
+        format_timeout=0,
+    )
+    exc = _capture()
+
+    excepthook(ValueError, exc, exc.__traceback__)
+
+    output = capsys.readouterr().err
+    assert output.startswith("Traceback (most recent call last):")
+    assert 'File "' in output
+    assert "ValueError: budget test" in output
+
+
+def test_logging_formatter_uses_configured_budget():
+    beautiful_traceback.configure(format_timeout=0)
+
+    logger = logging.getLogger("test_deadline")
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(beautiful_traceback.LoggingFormatter())
+    logger.addHandler(handler)
+
+    try:
+        try:
+            _raise_value_error()
+        except ValueError:
+            logger.exception("failed")
+    finally:
+        logger.removeHandler(handler)
+
+    output = stream.getvalue()
+    assert 'File "' in output
+    assert "ValueError: budget test" in output
+    assert deadline.get_formatting_stats()["timeout_fallbacks"] == 1
+
+
+def test_format_timeout_env_var(monkeypatch):
+    monkeypatch.setenv("BEAUTIFUL_TRACEBACK_FORMAT_TIMEOUT", "0.25")
+    assert bt_config.get_format_timeout() == 0.25
+
+    monkeypatch.setenv("BEAUTIFUL_TRACEBACK_FORMAT_TIMEOUT", "not-a-number")
+    assert bt_config.get_format_timeout() is None
+
+
+def test_get_formatting_stats_is_exposed():
+    assert beautiful_traceback.get_formatting_stats is deadline.get_formatting_stats
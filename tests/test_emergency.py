@@ -0,0 +1,116 @@
+"""Tests for the low-allocation MemoryError/RecursionError path."""
+
+import io
+import sys
+import threading
+
+import pytest
+
+from beautiful_traceback import emergency, hook
+
+
+@pytest.fixture(autouse=True)
+def primed():
+    emergency.prime()
+    yield
+    emergency.prime()
+
+
+def _recurse(depth: int) -> int:
+    return _recurse(depth + 1) + 1
+
+
+def _capture_recursion_error() -> RecursionError:
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(200)
+    try:
+        _recurse(0)
+    except RecursionError as exc:
+        return exc
+    finally:
+        sys.setrecursionlimit(limit)
+    raise AssertionError("unreachable")
+
+
+def _excepthook():
+    return hook.init_excepthook(
+        color=False, local_stack_only=False, exclude_patterns=()
+    )
+
+
+def test_recursion_error_summary(capfd):
+    exc = _capture_recursion_error()
+
+    _excepthook()(RecursionError, exc, exc.__traceback__)
+
+    output = capfd.readouterr().err
+    lines = output.splitlines()
+    assert lines[0] == "Aliases for entries in sys.path:"
+    assert "Traceback (most recent call last):" in lines
+    assert "frames omitted" in output
+    assert "<pwd> tests/test_emergency.py:" in output
+    assert "  _capture_recursion_error" in output
+    assert lines[-1] == "RecursionError: maximum recursion depth exceeded"
+
+    frame_lines = [line for line in lines if "tests/test_emergency.py:" in line]
+    assert len(frame_lines) == emergency.HEAD_FRAMES + emergency.TAIL_FRAMES
+
+
+def test_memory_error_releases_reserve(capfd):
+    try:
+        raise MemoryError()
+    except MemoryError as exc:
+        _excepthook()(MemoryError, exc, exc.__traceback__)
+
+    output = capfd.readouterr().err
+    assert "test_memory_error_releases_reserve" in output
+    assert output.endswith("MemoryError\n")
+    assert emergency._reserve is None
+
+    emergency.prime()
+    assert emergency._reserve is not None
+
+
+def test_thread_header(capfd):
+    thread = threading.Thread(name="OOMWorker", daemon=True)
+    try:
+        raise MemoryError("out of memory")
+    except MemoryError as exc:
+        _excepthook()(MemoryError, exc, exc.__traceback__, thread=thread)
+
+    output = capfd.readouterr().err
+    assert output.startswith("Exception in thread OOMWorker (daemon):\n")
+    assert output.endswith("MemoryError: out of memory\n")
+
+
+def test_stderr_without_file_descriptor(monkeypatch):
+    stream = io.StringIO()
+    monkeypatch.setattr(sys, "stderr", stream)
+
+    try:
+        raise MemoryError("redirected")
+    except MemoryError as exc:
+        emergency.write_emergency(MemoryError, exc, exc.__traceback__)
+
+    assert stream.getvalue().endswith("MemoryError: redirected\n")
+
+
+def test_long_message_is_truncated(capfd):
+    exc = MemoryError("x" * 10_000)
+
+    emergency.write_emergency(MemoryError, exc, None)
+
+    output = capfd.readouterr().err
+    assert output.endswith("x" * emergency.MAX_MESSAGE_LEN + "\n")
+    assert len(output) < 1_000
+
+
+def test_other_exceptions_use_full_pipeline(capsys):
+    try:
+        raise ValueError("regular")
+    except ValueError as exc:
+        _excepthook()(ValueError, exc, exc.__traceback__)
+
+    output = capsys.readouterr().err
+    assert "frames omitted" not in output
+    assert "ValueError: regular" in output
@@ -0,0 +1,135 @@
+"""Tests for the frame filters applied while walking tracebacks."""
+
+import sys
+import traceback as tb
+
+from beautiful_traceback import formatting, frame_filter
+
+
+def _raise_from_module(module_name: str):
+    """Raise from a function whose globals claim to belong to `module_name`."""
+    namespace = {"__name__": module_name}
+    exec("def fail():\n    raise ValueError('boom')\n", namespace)
+    try:
+        namespace["fail"]()
+    except ValueError as exc:
+        return exc, namespace["fail"].__code__
+
+    raise AssertionError("unreachable")
+
+
+def test_framework_frames_identified_by_module_name():
+    frame = sys._getframe()
+    assert not frame_filter.is_framework_frame(frame)
+
+    # this test is called by pytest, some frame up the stack belongs to it
+    callers = []
+    while frame.f_back is not None:
+        frame = frame.f_back
+        callers.append(frame_filter.is_framework_frame(frame))
+    assert any(callers)
+
+
+def test_framework_verdict_cached_per_code_object():
+    exc, code = _raise_from_module("_pytest.fake_runner")
+    frames = list(tb.walk_tb(exc.__traceback__))
+
+    assert frame_filter.visible_frames(frames, hide_framework_frames=True)
+    assert frame_filter._framework_verdicts[code] is True
+
+
+def test_visible_frames_drop_framework_frames():
+    exc, _ = _raise_from_module("pluggy._fake_callers")
+    frames = list(tb.walk_tb(exc.__traceback__))
+
+    visible = frame_filter.visible_frames(frames, hide_framework_frames=True)
+
+    assert [frame.f_code.co_name for frame, _ in visible] == ["_raise_from_module"]
+    assert frame_filter.visible_frames(frames) == frames
+
+
+def test_purely_internal_errors_keep_all_frames():
+    exc, _ = _raise_from_module("_pytest.fake_runner")
+    # only the frame raised by the "framework"
+    frames = list(tb.walk_tb(exc.__traceback__.tb_next))
+
+    assert frame_filter.visible_frames(frames, hide_framework_frames=True) == frames
+
+
+def test_exc_to_tracebacks_hides_framework_frames():
+    exc, _ = _raise_from_module("_pytest.fake_runner")
+
+    (traceback,) = formatting.exc_to_tracebacks(
+        exc, exc.__traceback__, hide_framework_frames=True
+    )
+
+    assert [frame.call for frame in traceback.stack_frames] == ["_raise_from_module"]
+
+
+def _hidden_helper():
+    __tracebackhide__ = True
+    raise ValueError("from hidden helper")
+
+
+def _conditionally_hidden_helper(hide):
+    __tracebackhide__ = hide
+    raise ValueError("from conditionally hidden helper")
+
+
+def _callable_marker_helper():
+    __tracebackhide__ = lambda excinfo: True
+    raise ValueError("from callable marker helper")
+
+
+def _walk(func, *args):
+    try:
+        func(*args)
+    except ValueError as exc:
+        return list(tb.walk_tb(exc.__traceback__))
+
+    raise AssertionError("unreachable")
+
+
+def _names(frames):
+    return [frame.f_code.co_name for frame, _ in frames]
+
+
+def test_static_tracebackhide_resolved_from_code():
+    frames = _walk(_hidden_helper)
+
+    assert _names(frame_filter.visible_frames(frames)) == ["_walk"]
+    assert frame_filter._local_markers[_hidden_helper.__code__] is True
+
+
+def test_dynamic_tracebackhide_read_from_frame():
+    hidden = _walk(_conditionally_hidden_helper, True)
+    shown = _walk(_conditionally_hidden_helper, False)
+
+    assert _names(frame_filter.visible_frames(hidden)) == ["_walk"]
+    assert _names(frame_filter.visible_frames(shown)) == [
+        "_walk",
+        "_conditionally_hidden_helper",
+    ]
+    code = _conditionally_hidden_helper.__code__
+    assert frame_filter._local_markers[code] == frame_filter._DYNAMIC
+
+
+def test_callable_tracebackhide_is_shown():
+    frames = _walk(_callable_marker_helper)
+
+    assert frame_filter.visible_frames(frames) == frames
+
+
+def test_module_tracebackhide():
+    exc, code = _raise_from_module("hidden_module")
+    exc.__traceback__.tb_next.tb_frame.f_globals["__tracebackhide__"] = True
+    frames = list(tb.walk_tb(exc.__traceback__))
+
+    assert _names(frame_filter.visible_frames(frames)) == ["_raise_from_module"]
+    assert frame_filter._local_markers[code] == frame_filter._NOT_LOCAL
+
+
+def test_all_hidden_frames_are_kept():
+    frames = _walk(_hidden_helper)[1:]
+
+    assert frame_filter.visible_frames(frames) == frames
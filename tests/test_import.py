@@ -11,3 +11,88 @@ def test_import() -> None:
 def test_version() -> None:
     """Test that the version is available."""
     assert isinstance(beautiful_traceback.__version__, str)
+
+
+HEAVY_MODULES = (
+    "colorama",
+    "importlib.metadata",
+    "inspect",
+    "logging",
+    "re",
+    "subprocess",
+    "typing",
+)
+
+
+def _new_modules(code: str) -> set[str]:
+    import subprocess
+    import sys
+
+    script = (
+        "import sys\n"
+        "before = set(sys.modules)\n"
+        f"{code}\n"
+        "print('\\n'.join(sorted(set(sys.modules) - before)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+def test_package_import_is_lazy() -> None:
+    """`import beautiful_traceback` doesn't import any submodules."""
+    assert _new_modules("import beautiful_traceback") == {"beautiful_traceback"}
+
+
+def test_install_avoids_heavy_imports() -> None:
+    """install() only hooks, formatting imports happen on first exception."""
+    new_modules = _new_modules(
+        "import beautiful_traceback\nbeautiful_traceback.install(only_tty=False)"
+    )
+
+    assert "beautiful_traceback.hook" in new_modules
+    assert "beautiful_traceback.formatting" not in new_modules
+    assert new_modules.isdisjoint(HEAVY_MODULES)
+
+
+def test_compact_interrupt_avoids_heavy_imports() -> None:
+    """A Ctrl-C rendered compactly doesn't pull in the formatter."""
+    new_modules = _new_modules(
+        "import beautiful_traceback\n"
+        "beautiful_traceback.install(only_tty=False)\n"
+        "try:\n"
+        "    raise KeyboardInterrupt\n"
+        "except KeyboardInterrupt as exc:\n"
+        "    sys.excepthook(KeyboardInterrupt, exc, exc.__traceback__)"
+    )
+
+    assert "beautiful_traceback.formatting" not in new_modules
+    assert "colorama" not in new_modules
+
+
+def test_lazy_attributes() -> None:
+    """Public attributes resolve to their submodule definitions."""
+    from beautiful_traceback import formatting, hook
+
+    assert beautiful_traceback.install is hook.install
+    assert beautiful_traceback.LoggingFormaterMixin is formatting.LoggingFormatterMixin
+    assert "install" in dir(beautiful_traceback)
+
+
+def test_version_is_resolved_lazily() -> None:
+    """importlib.metadata is only imported once __version__ is accessed."""
+    assert "importlib.metadata" not in _new_modules(
+        "import beautiful_traceback.version"
+    )
+    assert "importlib.metadata" in _new_modules(
+        "import beautiful_traceback\nbeautiful_traceback.__version__"
+    )
+
+
+def test_version_is_cached() -> None:
+    """The version module caches the resolved value."""
+    from beautiful_traceback import version
+
+    assert beautiful_traceback.__version__ == version.__version__
+    assert "__version__" in vars(version)
@@ -459,3 +459,26 @@ def test_configure_local_stack_only_overridden_per_call(env_setup, clean_config)
         result_local = exc_to_json(exc_info)
 
     assert len(result_all["frames"]) >= len(result_local["frames"])
+
+
+@pytest.mark.parametrize("explicit_cause", [True, False])
+def test_tracebacks_to_json_matches_exc_to_json(env_setup, explicit_cause):
+    from beautiful_traceback.json_formatting import tracebacks_to_json
+
+    try:
+        try:
+            raise KeyError("inner")
+        except KeyError as inner:
+            if explicit_cause:
+                raise RuntimeError("outer") from inner
+            raise RuntimeError("outer")  # noqa: B904
+    except RuntimeError as exc:
+        outer = exc
+
+    tracebacks = formatting.exc_to_tracebacks(outer, outer.__traceback__)
+    result = tracebacks_to_json(tracebacks, local_stack_only=False)
+
+    assert result == exc_to_json(outer, outer.__traceback__, local_stack_only=False)
+    assert result["chain"][0]["relationship"] == (
+        "caused_by" if explicit_cause else "context"
+    )
@@ -0,0 +1,93 @@
+"""Tests for reporting where a stalled event loop is blocked."""
+
+import asyncio
+import io
+import time
+
+from beautiful_traceback import loop_watchdog
+
+
+def _block(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def _watch(body, threshold=0.05):
+    out = io.StringIO()
+
+    async def main():
+        watchdog = loop_watchdog.install_loop_watchdog(
+            threshold, file=out, local_stack_only=False
+        )
+        try:
+            # let the first heartbeat run
+            await asyncio.sleep(threshold)
+            await body()
+        finally:
+            watchdog.stop()
+        return watchdog
+
+    watchdog = asyncio.run(main())
+    return watchdog, out.getvalue()
+
+
+def test_stall_reported_with_blocking_stack():
+    async def body():
+        _block(0.3)
+
+    watchdog, text = _watch(body)
+
+    assert "Event loop blocked for more than" in text
+    assert "Loop thread (most recent call last):" in text
+    lines = text.splitlines()
+    assert lines[-2].endswith("_block(0.3)")
+    assert lines[-1].endswith("time.sleep(seconds)")
+    assert len(watchdog.stalls) == 1
+
+
+def test_repeated_stalls_deduplicated():
+    async def body():
+        for _ in range(3):
+            _block(0.3)
+            await asyncio.sleep(0.1)
+
+    watchdog, text = _watch(body)
+
+    assert text.count("Loop thread (most recent call last):") == 1
+    assert "again (3 times)" in text
+    (stall,) = watchdog.stalls.values()
+    assert stall.occurrences == 3
+    assert stall.location.endswith("in _block")
+
+
+def test_healthy_loop_not_reported():
+    async def body():
+        await asyncio.sleep(0.3)
+
+    watchdog, text = _watch(body)
+
+    assert text == ""
+    assert watchdog.stalls == {}
+
+
+def test_blocking_outside_the_loop_not_reported():
+    out = io.StringIO()
+    loop = asyncio.new_event_loop()
+
+    async def main():
+        watchdog = loop_watchdog.install_loop_watchdog(0.05, file=out)
+        await asyncio.sleep(0.05)
+        return watchdog
+
+    try:
+        watchdog = loop.run_until_complete(main())
+        # the loop is stopped, not stalled
+        _block(0.3)
+        loop.run_until_complete(asyncio.sleep(0.1))
+    finally:
+        loop.close()
+
+    assert watchdog._thread is not None
+    watchdog._thread.join(timeout=1)
+    assert not watchdog._thread.is_alive()
+    assert out.getvalue() == ""
+    assert watchdog.stalls == {}
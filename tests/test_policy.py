@@ -0,0 +1,117 @@
+"""Tests for per-exception-type excepthook policies."""
+
+import io
+import sys
+
+import pytest
+
+import beautiful_traceback
+from beautiful_traceback import hook, policy
+
+
+def _interrupted():
+    raise KeyboardInterrupt()
+
+
+def _call_hook(excepthook, exc: BaseException) -> None:
+    try:
+        raise exc
+    except BaseException as caught:
+        excepthook(type(caught), caught, caught.__traceback__)
+
+
+def _excepthook(policies):
+    return hook.init_excepthook(
+        color=False,
+        local_stack_only=False,
+        exclude_patterns=(),
+        policies=policy.PolicyTable(policies),
+    )
+
+
+def test_resolve_follows_mro():
+    table = policy.PolicyTable({OSError: "message", BrokenPipeError: "silent"})
+
+    assert table.resolve(BrokenPipeError) == "silent"
+    assert table.resolve(ConnectionResetError) == "message"
+    assert table.resolve(FileNotFoundError) == "message"
+    assert table.resolve(ValueError) == "full"
+
+
+def test_resolve_caches_classes_defined_later():
+    table = policy.PolicyTable({LookupError: "compact"})
+
+    class CustomKeyError(KeyError):
+        pass
+
+    assert CustomKeyError not in table._resolved
+    assert table.resolve(CustomKeyError) == "compact"
+    assert table._resolved[CustomKeyError] == "compact"
+
+
+def test_subclasses_are_precomputed():
+    table = policy.PolicyTable({OSError: "message"})
+
+    assert table._resolved[BrokenPipeError] == "message"
+    assert table._resolved[FileNotFoundError] == "message"
+
+
+def test_invalid_mode_raises():
+    with pytest.raises(ValueError, match="invalid policy mode 'loud'"):
+        policy.PolicyTable({ValueError: "loud"})  # type: ignore[dict-item]
+
+
+def test_silent_writes_nothing(capsys):
+    _call_hook(_excepthook({ValueError: "silent"}), ValueError("quiet"))
+
+    assert capsys.readouterr().err == ""
+
+
+def test_message_mode(capsys):
+    _call_hook(_excepthook({ValueError: "message"}), ValueError("just this"))
+
+    assert capsys.readouterr().err == "ValueError: just this\n"
+
+
+def test_compact_mode_shows_innermost_frame(capsys):
+    excepthook = _excepthook({KeyboardInterrupt: "compact"})
+
+    try:
+        _interrupted()
+    except KeyboardInterrupt as exc:
+        excepthook(KeyboardInterrupt, exc, exc.__traceback__)
+
+    lines = capsys.readouterr().err.splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("  _interrupted")
+    assert "tests/test_policy.py:" in lines[0]
+    assert lines[1] == "KeyboardInterrupt"
+
+
+def test_full_mode_is_default(capsys):
+    _call_hook(_excepthook({}), ValueError("everything"))
+
+    output = capsys.readouterr().err
+    assert "Traceback (most recent call last):" in output
+    assert "ValueError: everything" in output
+
+
+def test_install_merges_default_policies():
+    captured = io.StringIO()
+    original_stderr = sys.stderr
+    beautiful_traceback.install(
+        only_tty=False, color=False, policies={ValueError: "message"}
+    )
+
+    try:
+        sys.stderr = captured
+        _call_hook(sys.excepthook, ValueError("merged"))
+        _call_hook(sys.excepthook, KeyboardInterrupt())
+    finally:
+        sys.stderr = original_stderr
+        beautiful_traceback.uninstall()
+
+    lines = captured.getvalue().splitlines()
+    assert lines[0] == "ValueError: merged"
+    assert lines[-1] == "KeyboardInterrupt"
+    assert "Traceback (most recent call last):" not in lines
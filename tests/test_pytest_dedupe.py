@@ -0,0 +1,44 @@
+"""Tests for printing identical pytest failures once."""
+
+import tests.fixtures
+
+pytest_plugins = ["pytester"]
+
+
+def test_identical_failures_rendered_once(pytester, monkeypatch):
+    calls = tests.fixtures.count_renders(monkeypatch)
+    pytester.makepyfile(tests.fixtures.BROKEN_FIXTURE_TESTS)
+
+    result = pytester.runpytest("-p", "no:cacheprovider")
+
+    result.assert_outcomes(errors=4, failed=1)
+    assert len(calls) == 2
+    output = result.stdout.str()
+    assert output.count("fixture is broken") == 1
+    assert output.count("Same traceback as ") == 3
+    result.stdout.fnmatch_lines(
+        [
+            "*= identical failures =*",
+            "4 tests failed with the traceback of *test_uses_fixture[[]0[]]:",
+            "    *test_uses_fixture[[]1[]]",
+            "    *test_uses_fixture[[]2[]]",
+            "    *test_uses_fixture[[]3[]]",
+        ]
+    )
+
+
+def test_identical_failures_dedupe_disabled(pytester, monkeypatch):
+    calls = tests.fixtures.count_renders(monkeypatch)
+    pytester.makeini(
+        """
+        [pytest]
+        beautiful_traceback_dedupe_failures = false
+        """
+    )
+    pytester.makepyfile(tests.fixtures.BROKEN_FIXTURE_TESTS)
+
+    result = pytester.runpytest("-p", "no:cacheprovider")
+
+    result.assert_outcomes(errors=4, failed=1)
+    assert len(calls) == 5
+    assert "identical failures" not in result.stdout.str()
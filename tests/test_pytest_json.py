@@ -0,0 +1,76 @@
+"""Tests for streaming pytest failures to an NDJSON file."""
+
+import json
+
+import pytest
+
+import tests.fixtures
+
+pytest_plugins = ["pytester"]
+
+
+def _read_ndjson(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_json_report(pytester):
+    pytester.makeini(
+        """
+        [pytest]
+        enable_beautiful_traceback_local_stack_only = false
+        """
+    )
+    pytester.makepyfile(
+        tests.fixtures.BROKEN_FIXTURE_TESTS
+        + """
+def test_assertion():
+    assert [1, 2] == [1, 3]
+
+def test_passes():
+    pass
+"""
+    )
+    path = pytester.path / "failures.ndjson"
+
+    result = pytester.runpytest(
+        "-p", "no:cacheprovider", f"--beautiful-traceback-json={path}"
+    )
+
+    result.assert_outcomes(errors=4, failed=2, passed=1)
+    records = _read_ndjson(path)
+    assert [(r["nodeid"].partition("::")[2], r["phase"]) for r in records] == [
+        ("test_uses_fixture[0]", "setup"),
+        ("test_uses_fixture[1]", "setup"),
+        ("test_uses_fixture[2]", "setup"),
+        ("test_uses_fixture[3]", "setup"),
+        ("test_other", "call"),
+        ("test_assertion", "call"),
+    ]
+    fixture_record = records[0]
+    assert fixture_record["exception"] == "RuntimeError"
+    assert fixture_record["message"] == "fixture is broken"
+    assert fixture_record["frames"][-1]["function"] == "broken"
+    assert fixture_record["assertion_details"] is None
+    assert len({r["fingerprint"] for r in records[:4]}) == 1
+    assert records[4]["fingerprint"] != records[0]["fingerprint"]
+    assert "assert [1, 2] == [1, 3]" in records[5]["assertion_details"]
+
+
+@pytest.mark.parametrize("tbstyle", ["no", "line"])
+def test_json_report_with_terse_tb_styles(pytester, monkeypatch, tbstyle):
+    calls = tests.fixtures.count_renders(monkeypatch)
+    pytester.makepyfile(tests.fixtures.FAILING_TEST)
+    path = pytester.path / "failures.ndjson"
+
+    result = pytester.runpytest(
+        "-p",
+        "no:cacheprovider",
+        f"--tb={tbstyle}",
+        f"--beautiful-traceback-json={path}",
+    )
+
+    result.assert_outcomes(failed=1)
+    assert calls == []
+    assert "Traceback (most recent call last)" not in result.stdout.str()
+    (record,) = _read_ndjson(path)
+    assert record["message"] == "rendered lazily"
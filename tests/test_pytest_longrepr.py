@@ -0,0 +1,86 @@
+"""Tests for pytest failure snapshots, rendered when the terminal prints them."""
+
+import json
+
+from beautiful_traceback import pytest_longrepr
+
+import tests.fixtures
+
+pytest_plugins = ["pytester"]
+
+
+def test_failures_not_rendered_with_tb_no(pytester, monkeypatch):
+    calls = tests.fixtures.count_renders(monkeypatch)
+    pytester.makepyfile(tests.fixtures.FAILING_TEST)
+
+    result = pytester.runpytest("-p", "no:cacheprovider", "--tb=no")
+
+    result.assert_outcomes(failed=1)
+    assert calls == []
+    assert "FAILED test_failures_not_rendered_with_tb_no.py::test_fails" in (
+        result.stdout.str()
+    )
+
+
+def test_failures_keep_pytest_crash_line_with_tb_line(pytester, monkeypatch):
+    calls = tests.fixtures.count_renders(monkeypatch)
+    path = pytester.makepyfile(tests.fixtures.FAILING_TEST)
+
+    result = pytester.runpytest("-p", "no:cacheprovider", "--tb=line")
+
+    result.assert_outcomes(failed=1)
+    assert calls == []
+    result.stdout.fnmatch_lines([f"{path}:2: ValueError: rendered lazily"])
+
+
+def test_failures_rendered_once_when_printed(pytester, monkeypatch):
+    calls = tests.fixtures.count_renders(monkeypatch)
+    pytester.makepyfile(tests.fixtures.FAILING_TEST)
+
+    result = pytester.runpytest("-p", "no:cacheprovider", "-rf")
+
+    result.assert_outcomes(failed=1)
+    assert len(calls) == 1
+    output = result.stdout.str()
+    assert "rendered lazily" in output
+    # the short summary uses the crash message, not the first rendered line
+    result.stdout.fnmatch_lines(["FAILED *::test_fails - ValueError*"])
+
+
+def test_expected_failures_not_rendered(pytester, monkeypatch):
+    calls = tests.fixtures.count_renders(monkeypatch)
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.xfail
+        def test_expected():
+            raise ValueError("expected")
+        """
+    )
+
+    result = pytester.runpytest("-p", "no:cacheprovider")
+
+    result.assert_outcomes(xfailed=1)
+    assert calls == []
+
+
+def test_failures_serialized_as_snapshots(pytester, pytestconfig, monkeypatch):
+    """xdist workers send the snapshot, the controller renders it."""
+    pytester.makepyfile(tests.fixtures.FAILING_TEST)
+    reprec = pytester.inline_run("-p", "no:cacheprovider")
+    (report,) = reprec.getfailures()
+    assert isinstance(report.longrepr, pytest_longrepr.BeautifulLongRepr)
+
+    calls = tests.fixtures.count_renders(monkeypatch)
+    hook = pytestconfig.hook
+    data = hook.pytest_report_to_serializable(config=pytestconfig, report=report)
+    # what execnet would send, with no NamedTuples or other custom types
+    data = json.loads(json.dumps(data))
+    restored = hook.pytest_report_from_serializable(config=pytestconfig, data=data)
+
+    assert calls == []
+    assert isinstance(report.longrepr, pytest_longrepr.BeautifulLongRepr)
+    assert isinstance(restored.longrepr, pytest_longrepr.BeautifulLongRepr)
+    assert restored.longrepr.reprcrash == report.longrepr.reprcrash
+    assert str(restored.longrepr) == str(report.longrepr)
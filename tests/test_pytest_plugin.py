@@ -9,6 +9,10 @@ import pytest
 
 from beautiful_traceback import formatting, pytest_plugin
 
+import tests.fixtures
+
+pytest_plugins = ["pytester"]
+
 
 def test_plugin_hooks_exist():
     """Verify the plugin hooks are defined."""
@@ -221,5 +225,177 @@ def test_plugin_config_options_registered(pytestconfig):
     )
 
 
+def test_settings_resolved_once_per_session(pytestconfig):
+    """Options are resolved in pytest_configure and reused for every report."""
+    settings = pytest_plugin._get_settings(pytestconfig)
+
+    assert isinstance(settings, pytest_plugin.PluginSettings)
+    assert settings.enabled is True
+    assert pytest_plugin._get_settings(pytestconfig) is settings
+
+
+def test_passing_reports_skip_option_lookups(pytester, monkeypatch):
+    """Option lookups happen once per session, not per report."""
+    calls = []
+    original = pytest_plugin.get_pytest_option
+
+    def counting_get_pytest_option(*args, **kwargs):
+        calls.append(args[2])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(pytest_plugin, "get_pytest_option", counting_get_pytest_option)
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.parametrize("value", range(20))
+        def test_passes(value):
+            assert value >= 0
+
+        def test_fails():
+            assert 1 == 2
+        """
+    )
+
+    result = pytester.runpytest("-p", "no:cacheprovider")
+
+    result.assert_outcomes(passed=20, failed=1)
+    assert calls.count("enable_beautiful_traceback") == 1
+
+
+def test_ini_options_apply_to_failures(pytester):
+    pytester.makeini(
+        """
+        [pytest]
+        beautiful_traceback_show_aliases = false
+        enable_beautiful_traceback_local_stack_only = false
+        """
+    )
+    pytester.makepyfile(
+        """
+        def test_fails():
+            raise ValueError("from ini")
+        """
+    )
+
+    result = pytester.runpytest("-p", "no:cacheprovider")
+
+    result.assert_outcomes(failed=1)
+    output = result.stdout.str()
+    assert "from ini" in output
+    assert "Aliases for entries in sys.path:" not in output
+
+
+def _count_getrepr(monkeypatch) -> list[str]:
+    calls = []
+    original = pytest.ExceptionInfo.getrepr
+
+    def counting_getrepr(self, *args, **kwargs):
+        calls.append(type(self.value).__name__)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(pytest.ExceptionInfo, "getrepr", counting_getrepr)
+    return calls
+
+
+def test_failure_details_skip_getrepr_for_other_exceptions(monkeypatch):
+    calls = _count_getrepr(monkeypatch)
+    try:
+        raise ValueError("no repr needed")
+    except ValueError:
+        excinfo = pytest.ExceptionInfo.from_current()
+
+    details = pytest_plugin.get_failure_details(excinfo)
+
+    assert details == (None, None)
+    assert calls == []
+
+
+def test_failure_details_computed_once_per_exception(monkeypatch):
+    calls = _count_getrepr(monkeypatch)
+    try:
+        assert [1, 2] == [1, 3]
+    except AssertionError:
+        excinfo = pytest.ExceptionInfo.from_current()
+
+    details = pytest_plugin.get_failure_details(excinfo)
+    # pytest creates new ExceptionInfo objects for the same exception
+    same_exception = pytest.ExceptionInfo.from_exception(excinfo.value)
+
+    assert pytest_plugin.get_failure_details(same_exception) is details
+    assert details.assertion_details is not None
+    assert "At index 1 diff: 2 != 3" in details.assertion_details
+    assert calls == ["AssertionError"]
+
+
+def test_failure_details_reuse_pytest_longrepr(monkeypatch):
+    try:
+        assert 1 == 2
+    except AssertionError:
+        excinfo = pytest.ExceptionInfo.from_current()
+
+    longrepr = excinfo.getrepr(style="long")
+    calls = _count_getrepr(monkeypatch)
+
+    details = pytest_plugin.get_failure_details(excinfo, longrepr)
+
+    assert details.assertion_details is not None
+    assert "assert 1 == 2" in details.assertion_details
+    assert calls == []
+
+
+def test_framework_frames_hidden(pytester):
+    pytester.makeini(
+        """
+        [pytest]
+        enable_beautiful_traceback_local_stack_only = false
+        """
+    )
+    pytester.makepyfile(tests.fixtures.FAILING_TEST)
+
+    hidden = pytester.runpytest("-p", "no:cacheprovider").stdout.str()
+    shown = pytester.runpytest(
+        "-p",
+        "no:cacheprovider",
+        "-o",
+        "beautiful_traceback_hide_framework_frames=false",
+    ).stdout.str()
+
+    assert "rendered lazily" in hidden
+    assert "_pytest/" not in hidden
+    assert "pluggy/" not in hidden
+    assert "_pytest/" in shown
+
+
+LOADED_MODULES_CONFTEST = """
+import sys
+
+def pytest_sessionfinish(session):
+    for name in ("beautiful_traceback.formatting", "beautiful_traceback.pytest_longrepr"):
+        print(f"{name} loaded: {name in sys.modules}")
+"""
+
+
+def test_formatting_not_imported_without_failures(pytester):
+    """The entry point stays light until a failure has to be reported."""
+    pytester.makeconftest(LOADED_MODULES_CONFTEST)
+    pytester.makepyfile(tests.fixtures.FAILING_TEST)
+
+    collect_only = pytester.runpytest_subprocess("-p", "no:cacheprovider", "--co")
+    disabled = pytester.runpytest_subprocess(
+        "-p", "no:cacheprovider", "-o", "enable_beautiful_traceback=false"
+    )
+    failing = pytester.runpytest_subprocess("-p", "no:cacheprovider")
+
+    for result in (collect_only, disabled):
+        result.stdout.fnmatch_lines(
+            [
+                "*beautiful_traceback.formatting loaded: False",
+                "beautiful_traceback.pytest_longrepr loaded: False",
+            ]
+        )
+    failing.stdout.fnmatch_lines(["*beautiful_traceback.formatting loaded: True"])
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
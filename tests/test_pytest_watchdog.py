@@ -0,0 +1,38 @@
+"""Tests for dumping the thread stacks of tests running past a timeout."""
+
+import pytest
+
+pytest_plugins = ["pytester"]
+
+
+def test_hung_test_stacks_dumped(pytester):
+    pytester.makepyfile(
+        """
+        import time
+
+        def wait_for_something():
+            time.sleep(1)
+
+        def test_hangs():
+            wait_for_something()
+        """
+    )
+
+    result = pytester.runpytest_subprocess(
+        "-p", "no:cacheprovider", "-s", "--beautiful-traceback-timeout=0.2"
+    )
+
+    result.assert_outcomes(passed=1)
+    stderr = result.stderr.str()
+    assert "test_hangs is still running after 0.2s, stacks of all threads:" in stderr
+    assert stderr.count("is still running") == 1
+    result.stderr.fnmatch_lines(
+        ['Thread "MainThread" (most recent call last):', "*wait_for_something*"]
+    )
+    assert "beautiful-traceback-watchdog" not in stderr
+
+
+def test_invalid_timeout(pytester):
+    result = pytester.runpytest("-o", "beautiful_traceback_timeout=soon")
+
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
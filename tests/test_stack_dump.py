@@ -0,0 +1,141 @@
+"""Tests for rendering the live stacks of threads."""
+
+import io
+import itertools
+import os
+import signal
+import sys
+import threading
+
+import pytest
+
+from beautiful_traceback import stack_dump
+from beautiful_traceback.common import ALIASES_HEAD
+
+
+def _wait_for(event: threading.Event) -> None:
+    event.wait()
+
+
+@pytest.fixture
+def waiting_thread():
+    release = threading.Event()
+    thread = threading.Thread(
+        target=_wait_for, args=(release,), name="waiting-thread", daemon=True
+    )
+    thread.start()
+    yield thread
+    release.set()
+    thread.join()
+
+
+def test_thread_stacks_of_all_threads(waiting_thread):
+    stacks = {stack.title: stack for stack in stack_dump.thread_stacks()}
+
+    waiting = stacks['Thread "waiting-thread" (daemon)']
+    calls = [entry.call for entry in waiting.entries]
+    assert calls[-3:] == ["_wait_for", "wait", "wait"]
+    main = stacks[f'Thread "{threading.main_thread().name}"']
+    assert main.entries[-1].call == "thread_stacks"
+
+
+def test_exclude_threads(waiting_thread):
+    stacks = stack_dump.thread_stacks(exclude_threads={waiting_thread.ident})
+
+    assert 'Thread "waiting-thread" (daemon)' not in [stack.title for stack in stacks]
+
+
+def test_format_thread_stacks(waiting_thread):
+    text = stack_dump.format_thread_stacks(local_stack_only=False, term_width=80)
+
+    assert 'Thread "waiting-thread" (daemon) (most recent call last):' in text
+    (line,) = [line for line in text.splitlines() if "_wait_for" in line]
+    assert "test_stack_dump.py" in line
+    assert line.endswith("event.wait()")
+    # a single aliases section for all threads
+    assert text.count(ALIASES_HEAD) <= 1
+
+
+def test_format_thread_stacks_filters(waiting_thread):
+    text = stack_dump.format_thread_stacks(
+        local_stack_only=False, exclude_patterns=[r"test_stack_dump\.py"]
+    )
+
+    assert 'Thread "waiting-thread" (daemon) (most recent call last):' in text
+    assert "_wait_for" not in text
+
+    local_text = stack_dump.format_thread_stacks(local_stack_only=True)
+    assert "threading.py" not in local_text
+
+
+def test_stacks_without_local_frames_counted():
+    release = threading.Event()
+    # only threading.py frames
+    threads = [
+        threading.Thread(target=release.wait, name=f"library-{i}", daemon=True)
+        for i in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        current = sys._current_frames()
+        frames = {
+            ident: current[ident]
+            for ident in [threading.get_ident()] + [thread.ident for thread in threads]
+        }
+        text = stack_dump.format_thread_stacks(
+            local_stack_only=True, frames=frames, group=False
+        )
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    assert '"library-' not in text
+    assert text.endswith(f"2 stacks with only library or excluded frames{os.linesep}")
+    assert f'Thread "{threading.main_thread().name}"' in text
+
+
+@pytest.fixture
+def waiting_pool():
+    release = threading.Event()
+    threads = [
+        threading.Thread(
+            target=_wait_for, args=(release,), name=f"pool-{i}", daemon=True
+        )
+        for i in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    yield threads
+    release.set()
+    for thread in threads:
+        thread.join()
+
+
+def test_identical_stacks_grouped(waiting_pool):
+    titles = [stack.title for stack in stack_dump.thread_stacks()]
+
+    (title,) = [title for title in titles if "pool-" in title]
+    assert title == '×5 threads in wait: "pool-0", "pool-1", "pool-2" and 2 more'
+
+    ungrouped = [stack.title for stack in stack_dump.thread_stacks(group=False)]
+    assert 'Thread "pool-4" (daemon)' in ungrouped
+
+
+def test_install_stack_dump(waiting_thread):
+    out = io.StringIO()
+    previous = stack_dump.install_stack_dump(signal.SIGUSR1, file=out)
+    try:
+        os.kill(os.getpid(), signal.SIGUSR1)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+
+    text = out.getvalue()
+    assert "Stacks of all threads on SIGUSR1:" in text
+    assert 'Thread "waiting-thread" (daemon) (most recent call last):' in text
+    # the main thread's stack ends where the signal interrupted it
+    main_title = f'Thread "{threading.main_thread().name}" (most recent call last):'
+    main_lines = text.split(main_title)[1].splitlines()[1:]
+    main_rows = list(itertools.takewhile(lambda line: line[:1] == " ", main_lines))
+    assert main_rows[-1].endswith("os.kill(os.getpid(), signal.SIGUSR1)")
@@ -0,0 +1,163 @@
+"""Tests for rendering the await stacks of asyncio tasks."""
+
+import asyncio
+import io
+import os
+import signal
+import threading
+
+from beautiful_traceback import task_dump, task_origins
+
+
+async def _wait_for(event: asyncio.Event) -> None:
+    await event.wait()
+
+
+async def _sleep_forever() -> None:
+    await asyncio.sleep(3600)
+
+
+def _run_with_tasks(check, waiting=1, sleeping=0):
+    async def main():
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(_wait_for(release), name=f"waiter-{i}")
+            for i in range(waiting)
+        ]
+        tasks += [
+            asyncio.create_task(_sleep_forever(), name=f"sleeper-{i}")
+            for i in range(sleeping)
+        ]
+        # let the tasks reach their await
+        await asyncio.sleep(0)
+        try:
+            return await check()
+        finally:
+            release.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return asyncio.run(main())
+
+
+def test_task_stacks_of_suspended_coroutines():
+    async def check():
+        current = asyncio.current_task()
+        return task_dump.task_stacks(
+            task for task in asyncio.all_tasks() if task is not current
+        )
+
+    (stack,) = _run_with_tasks(check)
+
+    assert stack.title == 'Task "waiter-0" running _wait_for'
+    calls = [entry.call for entry in stack.entries]
+    assert calls == ["_wait_for", "wait"]
+    assert stack.entries[0].src_ctx == "await event.wait()"
+
+
+def test_identical_await_stacks_grouped():
+    async def check():
+        return await task_dump.format_task_stacks(local_stack_only=False)
+
+    text = _run_with_tasks(check, waiting=5, sleeping=1)
+
+    assert (
+        '×5 tasks in wait: "waiter-0", "waiter-1", "waiter-2" and 2 more'
+        " (most recent call last):"
+    ) in text
+    assert 'Task "sleeper-0" running _sleep_forever (most recent call last):' in text
+    assert text.count("await event.wait()") == 1
+
+
+def _spawn_waiters(release: asyncio.Event, count: int) -> list[asyncio.Task]:
+    return [asyncio.create_task(_wait_for(release)) for _ in range(count)]
+
+
+def _spawn_other_waiter(release: asyncio.Event) -> asyncio.Task:
+    return asyncio.create_task(_wait_for(release), name="other-waiter")
+
+
+def test_task_origins_shown_in_dump():
+    async def main():
+        task_origins.install_task_origins()
+        release = asyncio.Event()
+        tasks = _spawn_waiters(release, 3) + [_spawn_other_waiter(release)]
+        await asyncio.sleep(0)
+        try:
+            return await task_dump.format_task_stacks(local_stack_only=False)
+        finally:
+            release.set()
+            await asyncio.gather(*tasks)
+
+    text = asyncio.run(main())
+
+    # tasks waiting at the same line but created elsewhere aren't grouped
+    assert "×3 tasks in wait" in text
+    assert 'Task "other-waiter" running _wait_for' in text
+    assert text.count("Task created at (most recent call last):") == 2
+    assert "return [asyncio.create_task(_wait_for(release)) for" in text
+    assert 'return asyncio.create_task(_wait_for(release), name="other-waiter")' in (
+        text
+    )
+
+
+def test_format_task_stacks_yields_between_chunks():
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    async def check():
+        ticker = asyncio.create_task(tick())
+        await asyncio.sleep(0)
+        before = ticks
+        text = await task_dump.format_task_stacks(chunk_size=2)
+        ticker.cancel()
+        return text, ticks - before
+
+    text, ticks_during_dump = _run_with_tasks(check, waiting=6)
+
+    assert "×6 tasks in wait" in text
+    # the loop kept running while the dump went through 7 tasks
+    assert ticks_during_dump >= 3
+
+
+def test_format_task_stacks_renders_off_the_loop(monkeypatch):
+    render_threads = []
+
+    def format_stacks(stacks, *args, **kwargs):
+        render_threads.append(threading.get_ident())
+        return "rendered"
+
+    monkeypatch.setattr(task_dump, "format_stacks", format_stacks)
+
+    async def check():
+        return await task_dump.format_task_stacks()
+
+    assert _run_with_tasks(check) == "rendered"
+    assert render_threads and render_threads[0] != threading.get_ident()
+
+
+def test_install_task_dump():
+    out = io.StringIO()
+
+    async def check():
+        task_dump.install_task_dump(signal.SIGUSR1, file=out, local_stack_only=False)
+        try:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            for _ in range(100):
+                if out.getvalue():
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            task_dump.uninstall_task_dump(signal.SIGUSR1)
+
+    _run_with_tasks(check)
+
+    text = out.getvalue()
+    assert "Stacks of all tasks:" in text
+    assert 'Task "waiter-0" running _wait_for (most recent call last):' in text
@@ -0,0 +1,126 @@
+"""Tests for recording where asyncio tasks were created."""
+
+import asyncio
+import gc
+import io
+import sys
+
+import beautiful_traceback
+from beautiful_traceback import task_origins
+
+
+async def _noop() -> None:
+    pass
+
+
+async def _fail() -> None:
+    raise ValueError("spawned task failed")
+
+
+def _spawn(coro_func=_noop):
+    return asyncio.create_task(coro_func())
+
+
+def _run(check, **options):
+    async def main():
+        task_origins.install_task_origins(**options)
+        return await check()
+
+    return asyncio.run(main(), loop_factory=beautiful_traceback.new_event_loop)
+
+
+def test_origin_recorded_at_creator():
+    async def check():
+        task = _spawn()
+        await task
+        return task_origins.task_origin(task), task_origins.format_task_origin(
+            task, local_stack_only=False
+        )
+
+    origin, text = _run(check)
+
+    code, _ = origin[0]
+    assert code is _spawn.__code__
+    assert "Task created at (most recent call last):" in text
+    lines = text.splitlines()
+    assert lines[-2].endswith("task = _spawn()")
+    assert lines[-1].endswith("return asyncio.create_task(coro_func())")
+
+
+def test_origin_stitched_with_creating_task():
+    async def spawn_child():
+        return _spawn()
+
+    async def check():
+        child = await _spawn(spawn_child)
+        await child
+        return task_origins.task_origin(child)
+
+    origin = _run(check)
+
+    codes = [code for code, _ in origin]
+    # the child's creator, then where its parent task was created
+    assert codes[:4] == [
+        _spawn.__code__,
+        spawn_child.__code__,
+        _spawn.__code__,
+        check.__code__,
+    ]
+
+
+def test_origin_depth_and_sampling():
+    async def check():
+        return task_origins.task_origin(_spawn())
+
+    (frame,) = _run(check, depth=1)
+    assert frame[0] is _spawn.__code__
+
+    assert _run(check, sample_rate=0.0) is None
+
+
+def test_previous_task_factory_wrapped():
+    created = []
+
+    def factory(loop, coro, **kwargs):
+        created.append(coro)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    async def check():
+        asyncio.get_running_loop().set_task_factory(factory)
+        task_origins.install_task_origins()
+        task = _spawn()
+        await task
+        return task_origins.task_origin(task)
+
+    origin = asyncio.run(check())
+
+    # asyncio.run() creates tasks of its own on shutdown
+    assert created[0].__name__ == "_noop"
+    assert origin[0][0] is _spawn.__code__
+
+
+def test_origin_shown_for_unretrieved_task_exception():
+    beautiful_traceback.install(
+        only_tty=False, color=False, asyncio_exception_handler=True
+    )
+
+    async def check():
+        task = _spawn(_fail)
+        await asyncio.sleep(0)
+        del task
+        gc.collect()
+
+    captured_output = io.StringIO()
+    original_stderr = sys.stderr
+    try:
+        sys.stderr = captured_output
+        _run(check)
+    finally:
+        sys.stderr = original_stderr
+        beautiful_traceback.uninstall()
+
+    output = captured_output.getvalue()
+    assert "ValueError: spawned task failed" in output
+    origin = output.split("ValueError: spawned task failed")[1]
+    assert "Task created at (most recent call last):" in origin
+    assert "return asyncio.create_task(coro_func())" in origin
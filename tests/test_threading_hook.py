@@ -3,8 +3,10 @@
 import io
 import sys
 import threading
+import time
 
 import beautiful_traceback
+from beautiful_traceback import output
 
 
 def test_threading_excepthook_installed():
@@ -83,3 +85,168 @@ def test_threading_excepthook_uninstall():
 
     beautiful_traceback.uninstall()
     assert threading.excepthook == original_hook
+
+
+def _run_crashing_threads(count: int, messages: list[str]) -> None:
+    barrier = threading.Barrier(count)
+
+    def crasher(message: str):
+        barrier.wait()
+        raise ConnectionError(message)
+
+    threads = [
+        threading.Thread(
+            target=crasher, args=(messages[i % len(messages)],), name=f"Worker-{i}"
+        )
+        for i in range(count)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_threading_excepthook_coalesces_identical_tracebacks():
+    """Test that a storm of identical thread exceptions is rendered once."""
+    beautiful_traceback.install(only_tty=False, color=False, thread_coalesce_window=30)
+
+    captured_output = io.StringIO()
+    original_stderr = sys.stderr
+
+    try:
+        sys.stderr = captured_output
+        _run_crashing_threads(20, ["pool closed"])
+        # uninstall flushes pending summaries
+        beautiful_traceback.uninstall()
+    finally:
+        sys.stderr = original_stderr
+        beautiful_traceback.uninstall()
+
+    output = captured_output.getvalue()
+
+    assert output.count("Traceback (most recent call last):") == 1
+    assert output.count("ConnectionError: pool closed") == 1
+    assert "... and 19 more threads with the same exception: [Worker-" in output
+
+
+def test_threading_excepthook_keeps_distinct_tracebacks():
+    """Test that different exceptions are not coalesced together."""
+    beautiful_traceback.install(only_tty=False, color=False, thread_coalesce_window=30)
+
+    captured_output = io.StringIO()
+    original_stderr = sys.stderr
+
+    try:
+        sys.stderr = captured_output
+        _run_crashing_threads(4, ["first", "second"])
+        beautiful_traceback.uninstall()
+    finally:
+        sys.stderr = original_stderr
+        beautiful_traceback.uninstall()
+
+    output = captured_output.getvalue()
+
+    assert output.count("ConnectionError: first") == 1
+    assert output.count("ConnectionError: second") == 1
+    assert output.count("... and 1 more threads with the same exception") == 2
+
+
+def test_threading_excepthook_summary_after_window():
+    """Test that summaries are written once the coalescing window closes."""
+    beautiful_traceback.install(
+        only_tty=False, color=False, thread_coalesce_window=0.05
+    )
+
+    captured_output = io.StringIO()
+    original_stderr = sys.stderr
+
+    try:
+        sys.stderr = captured_output
+        _run_crashing_threads(5, ["timed"])
+
+        for _ in range(100):
+            if "more threads" in captured_output.getvalue():
+                break
+            time.sleep(0.02)
+
+        output = captured_output.getvalue()
+    finally:
+        sys.stderr = original_stderr
+        beautiful_traceback.uninstall()
+
+    assert "... and 4 more threads with the same exception" in output
+
+
+def test_threading_excepthook_coalescing_disabled():
+    """Test that a zero window renders every thread exception."""
+    beautiful_traceback.install(only_tty=False, color=False, thread_coalesce_window=0)
+
+    captured_output = io.StringIO()
+    original_stderr = sys.stderr
+
+    try:
+        sys.stderr = captured_output
+        _run_crashing_threads(3, ["each"])
+    finally:
+        sys.stderr = original_stderr
+        beautiful_traceback.uninstall()
+
+    output = captured_output.getvalue()
+
+    assert output.count("ConnectionError: each") == 3
+    assert "more threads" not in output
+
+
+class _RecordingWriter(output.StderrWriter):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes: list[str] = []
+
+    def write(self, text: str) -> None:
+        with self.lock:
+            self.writes.append(text)
+
+
+def test_coalescer_writes_summary_with_next_traceback():
+    """Test that a summary and the traceback after it are one write."""
+    writer = _RecordingWriter()
+    coalescer = output.ThreadStormCoalescer(writer, window=30)
+    try:
+        coalescer.submit(("same",), "Worker-1", lambda: "traceback 1\n")
+        coalescer.submit(("same",), "Worker-2", lambda: "traceback 2\n")
+        # the window of the first burst closed without a flush
+        for burst in coalescer._bursts.values():
+            burst.started -= 60
+        coalescer.submit(("same",), "Worker-3", lambda: "traceback 3\n")
+    finally:
+        coalescer.close()
+
+    assert writer.writes == [
+        "traceback 1\n",
+        "... and 1 more threads with the same exception: [Worker-2]\ntraceback 3\n",
+    ]
+
+
+def test_coalescer_uses_one_flusher_thread():
+    """Test that bursts share one flusher instead of a timer thread each."""
+    writer = _RecordingWriter()
+    coalescer = output.ThreadStormCoalescer(writer, window=0.01)
+    try:
+        for burst in range(5):
+            coalescer.submit((burst,), "Worker-1", lambda: "traceback\n")
+            coalescer.submit((burst,), "Worker-2", lambda: "traceback\n")
+            time.sleep(0.02)
+
+        flushers = [
+            thread
+            for thread in threading.enumerate()
+            if thread.name == "beautiful-traceback-flusher"
+        ]
+        assert len(flushers) == 1
+        assert not any(isinstance(t, threading.Timer) for t in threading.enumerate())
+    finally:
+        coalescer.close()
+
+    summary = "... and 1 more threads with the same exception: [Worker-2]\n"
+    assert "".join(writer.writes).count(summary) == 5
+    assert not flushers[0].is_alive()
@@ -0,0 +1,134 @@
+"""Tests for the deferred excepthook trampolines used by the .pth injection."""
+
+import io
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from beautiful_traceback import hook, trampoline
+
+
+@pytest.fixture(autouse=True)
+def _restore_hooks():
+    yield
+    trampoline.remove()
+    hook.uninstall()
+
+
+def _crash_thread() -> None:
+    raise ValueError("thread crash")
+
+
+def test_install_deferred_only_swaps_hooks():
+    trampoline.install_deferred(only_tty=False, color=False)
+
+    assert sys.excepthook is trampoline._sys_trampoline
+    assert threading.excepthook is trampoline._thread_trampoline
+
+    trampoline.remove()
+
+    assert sys.excepthook is sys.__excepthook__
+    assert threading.excepthook is threading.__excepthook__
+
+
+def test_first_exception_installs_real_hook(monkeypatch):
+    captured = io.StringIO()
+    monkeypatch.setattr(sys, "stderr", captured)
+    trampoline.install_deferred(only_tty=False, color=False)
+
+    try:
+        raise ValueError("first crash")
+    except ValueError as exc:
+        sys.excepthook(ValueError, exc, exc.__traceback__)
+
+    assert sys.excepthook is not trampoline._sys_trampoline
+    assert sys.excepthook is not sys.__excepthook__
+    assert "ValueError: first crash" in captured.getvalue()
+    assert '  File "' not in captured.getvalue()
+
+
+def test_thread_trampoline(monkeypatch):
+    captured = io.StringIO()
+    monkeypatch.setattr(sys, "stderr", captured)
+    trampoline.install_deferred(only_tty=False, color=False)
+
+    thread = threading.Thread(target=_crash_thread, name="Crasher")
+    thread.start()
+    thread.join()
+
+    output = captured.getvalue()
+    assert "Exception in thread Crasher:" in output
+    assert "ValueError: thread crash" in output
+    assert threading.excepthook is not trampoline._thread_trampoline
+
+
+def test_chaining_wrapper_over_trampoline(monkeypatch):
+    """A wrapper calling the hook it replaced, like sentry-sdk's, is kept."""
+    captured = io.StringIO()
+    monkeypatch.setattr(sys, "stderr", captured)
+    trampoline.install_deferred(only_tty=False, color=False)
+
+    seen = []
+    wrapped_sys_hook = sys.excepthook
+    wrapped_thread_hook = threading.excepthook
+
+    def sys_wrapper(exc_type, exc_value, traceback):
+        seen.append(exc_value)
+        wrapped_sys_hook(exc_type, exc_value, traceback)
+
+    def thread_wrapper(args):
+        seen.append(args.exc_value)
+        wrapped_thread_hook(args)
+
+    monkeypatch.setattr(sys, "excepthook", sys_wrapper)
+    monkeypatch.setattr(threading, "excepthook", thread_wrapper)
+
+    try:
+        raise ValueError("wrapped crash")
+    except ValueError as exc:
+        sys.excepthook(ValueError, exc, exc.__traceback__)
+
+    thread = threading.Thread(target=_crash_thread, name="Crasher")
+    thread.start()
+    thread.join()
+
+    assert [str(exc) for exc in seen] == ["wrapped crash", "thread crash"]
+    assert sys.excepthook is sys_wrapper
+    assert threading.excepthook is thread_wrapper
+    output = captured.getvalue()
+    assert "ValueError: wrapped crash" in output
+    assert "ValueError: thread crash" in output
+
+
+def test_explicit_install_replaces_trampolines():
+    trampoline.install_deferred(only_tty=False)
+    hook.install(only_tty=False, color=False)
+
+    assert sys.excepthook is not trampoline._sys_trampoline
+    assert threading.excepthook is not trampoline._thread_trampoline
+
+
+def test_threading_hooked_on_later_import():
+    """Nothing but the trampoline is imported at startup, threading included."""
+    script = (
+        "import sys\n"
+        "from beautiful_traceback import trampoline\n"
+        "trampoline.install_deferred(only_tty=False, color=False)\n"
+        "assert 'threading' not in sys.modules\n"
+        "assert 'beautiful_traceback.hook' not in sys.modules\n"
+        "import threading\n"
+        "def crash():\n"
+        "    raise ValueError('late import')\n"
+        "thread = threading.Thread(target=crash, name='Late')\n"
+        "thread.start()\n"
+        "thread.join()\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+
+    assert "Exception in thread Late:" in result.stderr
+    assert "ValueError: late import" in result.stderr
+    assert '  File "' not in result.stderr
@@ -0,0 +1,46 @@
+"""Tests for warmup(), which pre-pays the cost of the first formatted exception."""
+
+import gc
+import subprocess
+import sys
+
+import beautiful_traceback
+from beautiful_traceback import config, deadline, formatting
+
+
+def test_warmup_imports_formatting():
+    script = (
+        "import sys\n"
+        "import beautiful_traceback\n"
+        "beautiful_traceback.install(only_tty=False)\n"
+        "assert 'beautiful_traceback.formatting' not in sys.modules\n"
+        "beautiful_traceback.warmup()\n"
+        "assert 'beautiful_traceback.formatting' in sys.modules\n"
+        "assert 'colorama' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def test_warmup_compiles_configured_patterns():
+    config.configure(exclude_patterns=[r"^warmup/pattern\.py$"])
+    try:
+        beautiful_traceback.warmup()
+        assert (r"^warmup/pattern\.py$",) in formatting._compiled_exclude_patterns
+    finally:
+        config._config.clear()
+
+
+def test_warmup_is_not_counted_as_formatted():
+    deadline.reset_formatting_stats()
+    beautiful_traceback.warmup()
+
+    assert deadline.get_formatting_stats()["formatted"] == 0
+
+
+def test_warmup_freeze(monkeypatch):
+    calls = []
+    monkeypatch.setattr(gc, "freeze", lambda: calls.append("freeze"))
+
+    beautiful_traceback.warmup(freeze=True)
+
+    assert calls == ["freeze"]